@@ -34,7 +34,6 @@ from pytgcalls.exceptions import (
 )
 from pytgcalls.types import Update
 from pytgcalls.types.input_stream import AudioPiped, AudioVideoPiped
-from pytgcalls.types.input_stream.quality import HighQualityAudio, MediumQualityVideo
 from pytgcalls.types.stream import StreamAudioEnded
 
 import config
@@ -56,6 +55,8 @@ from DeadlineTech.utils.exceptions import AssistantErr
 from DeadlineTech.utils.formatters import check_duration, seconds_to_min, speed_converter
 from DeadlineTech.utils.inline.play import stream_markup
 from DeadlineTech.utils.stream.autoclear import auto_clean
+from DeadlineTech.utils.stream.prefetch import prefetcher
+from DeadlineTech.utils.stream_formats import audio_quality, video_quality
 from DeadlineTech.utils.thumbnails import get_thumb
 from strings import get_string
 
@@ -65,6 +66,7 @@ counter = {}
 
 async def _clear_(chat_id):
     db[chat_id] = []
+    prefetcher.cancel(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
 
@@ -172,6 +174,8 @@ class Call(PyTgCalls):
     async def speedup_stream(self, chat_id: int, file_path, speed, playing):
         assistant = await group_assistant(self, chat_id)
         if str(speed) != str("1.0"):
+            if not await YouTube.wait_until_buffered(file_path):
+                raise AssistantErr("Download not finished")
             base = os.path.basename(file_path)
             chatdir = os.path.join(os.getcwd(), "playback", str(speed))
             if not os.path.isdir(chatdir):
@@ -212,14 +216,14 @@ class Call(PyTgCalls):
         stream = (
             AudioVideoPiped(
                 out,
-                audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
+                audio_parameters=audio_quality(),
+                video_parameters=video_quality(),
                 additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
             )
             if playing[0]["streamtype"] == "video"
             else AudioPiped(
                 out,
-                audio_parameters=HighQualityAudio(),
+                audio_parameters=audio_quality(),
                 additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
             )
         )
@@ -260,14 +264,20 @@ class Call(PyTgCalls):
         image: Union[bool, str] = None,
     ):
         assistant = await group_assistant(self, chat_id)
+        params = YouTube.ffmpeg_params(link)
         if video:
             stream = AudioVideoPiped(
                 link,
-                audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
+                audio_parameters=audio_quality(),
+                video_parameters=video_quality(),
+                additional_ffmpeg_parameters=params,
             )
         else:
-            stream = AudioPiped(link, audio_parameters=HighQualityAudio())
+            stream = AudioPiped(
+                link,
+                audio_parameters=audio_quality(),
+                additional_ffmpeg_parameters=params,
+            )
         await assistant.change_stream(
             chat_id,
             stream,
@@ -275,18 +285,19 @@ class Call(PyTgCalls):
 
     async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
         assistant = await group_assistant(self, chat_id)
+        params = f"{YouTube.ffmpeg_params(file_path)} -ss {to_seek} -to {duration}".strip()
         stream = (
             AudioVideoPiped(
                 file_path,
-                audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                audio_parameters=audio_quality(),
+                video_parameters=video_quality(),
+                additional_ffmpeg_parameters=params,
             )
             if mode == "video"
             else AudioPiped(
                 file_path,
-                audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                audio_parameters=audio_quality(),
+                additional_ffmpeg_parameters=params,
             )
         )
         await assistant.change_stream(chat_id, stream)
@@ -312,21 +323,28 @@ class Call(PyTgCalls):
         assistant = await group_assistant(self, chat_id)
         language = await get_lang(chat_id)
         _ = get_string(language)
+        params = YouTube.ffmpeg_params(link)
         if video:
             stream = AudioVideoPiped(
                 link,
-                audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
+                audio_parameters=audio_quality(),
+                video_parameters=video_quality(),
+                additional_ffmpeg_parameters=params,
             )
         else:
             stream = (
                 AudioVideoPiped(
                     link,
-                    audio_parameters=HighQualityAudio(),
-                    video_parameters=MediumQualityVideo(),
+                    audio_parameters=audio_quality(),
+                    video_parameters=video_quality(),
+                    additional_ffmpeg_parameters=params,
                 )
                 if video
-                else AudioPiped(link, audio_parameters=HighQualityAudio())
+                else AudioPiped(
+                    link,
+                    audio_parameters=audio_quality(),
+                    additional_ffmpeg_parameters=params,
+                )
             )
         try:
             await assistant.join_group_call(
@@ -387,8 +405,9 @@ class Call(PyTgCalls):
                 db[chat_id][0]["speed_path"] = None
                 db[chat_id][0]["speed"] = 1.0
             video = True if str(streamtype) == "video" else False
+            prefetcher.refresh(chat_id)
             if "live_" in queued:
-                n, link = await YouTube.video(videoid, True)
+                n, link = await YouTube.video(videoid, True, chat_id=chat_id)
                 if n == 0:
                     return await app.send_message(
                         original_chat_id,
@@ -397,13 +416,13 @@ class Call(PyTgCalls):
                 if video:
                     stream = AudioVideoPiped(
                         link,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
+                        audio_parameters=audio_quality(),
+                        video_parameters=video_quality(),
                     )
                 else:
                     stream = AudioPiped(
                         link,
-                        audio_parameters=HighQualityAudio(),
+                        audio_parameters=audio_quality(),
                     )
                 try:
                     await client.change_stream(chat_id, stream)
@@ -428,6 +447,7 @@ class Call(PyTgCalls):
                 db[chat_id][0]["mystic"] = run
                 db[chat_id][0]["markup"] = "tg"
             elif "vid_" in queued:
+                prefetcher.record(videoid, "video" if video else "audio")
                 mystic = await app.send_message(original_chat_id, _["call_7"])
                 try:
                     file_path, direct = await YouTube.download(
@@ -435,21 +455,26 @@ class Call(PyTgCalls):
                         mystic,
                         videoid=True,
                         video=True if str(streamtype) == "video" else False,
+                        progressive=True,
+                        chat_id=chat_id,
                     )
                 except:
                     return await mystic.edit_text(
                         _["call_6"], disable_web_page_preview=True
                     )
+                params = YouTube.ffmpeg_params(file_path)
                 if video:
                     stream = AudioVideoPiped(
                         file_path,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
+                        audio_parameters=audio_quality(),
+                        video_parameters=video_quality(),
+                        additional_ffmpeg_parameters=params,
                     )
                 else:
                     stream = AudioPiped(
                         file_path,
-                        audio_parameters=HighQualityAudio(),
+                        audio_parameters=audio_quality(),
+                        additional_ffmpeg_parameters=params,
                     )
                 try:
                     await client.change_stream(chat_id, stream)
@@ -478,11 +503,11 @@ class Call(PyTgCalls):
                 stream = (
                     AudioVideoPiped(
                         videoid,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
+                        audio_parameters=audio_quality(),
+                        video_parameters=video_quality(),
                     )
                     if str(streamtype) == "video"
-                    else AudioPiped(videoid, audio_parameters=HighQualityAudio())
+                    else AudioPiped(videoid, audio_parameters=audio_quality())
                 )
                 try:
                     await client.change_stream(chat_id, stream)
@@ -504,13 +529,13 @@ class Call(PyTgCalls):
                 if video:
                     stream = AudioVideoPiped(
                         queued,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
+                        audio_parameters=audio_quality(),
+                        video_parameters=video_quality(),
                     )
                 else:
                     stream = AudioPiped(
                         queued,
-                        audio_parameters=HighQualityAudio(),
+                        audio_parameters=audio_quality(),
                     )
                 try:
                     await client.change_stream(chat_id, stream)
@@ -31,6 +31,8 @@ import aiohttp
 from bs4 import BeautifulSoup
 from youtubesearchpython.__future__ import VideosSearch
 
+from DeadlineTech.utils.database import get_catalog_match, save_catalog_match
+
 
 class AppleAPI:
     def __init__(self):
@@ -43,9 +45,19 @@ class AppleAPI:
         else:
             return False
 
+    def catalog_id(self, url: str):
+        # Album links point at a song with ?i=<id>; without it the album itself is played.
+        match = re.search(r"[?&]i=(\d+)", url) or re.search(r"/(\d+)(?:[/?#]|$)", url)
+        return match.group(1) if match else None
+
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
+        track_id = self.catalog_id(url)
+        if track_id:
+            matched = await get_catalog_match("apple", track_id)
+            if matched:
+                return matched, matched["vidid"]
         async with aiohttp.ClientSession() as session:
             async with session.get(url) as response:
                 if response.status != 200:
@@ -72,6 +84,8 @@ class AppleAPI:
             "duration_min": duration_min,
             "thumb": thumbnail,
         }
+        if track_id:
+            await save_catalog_match("apple", track_id, track_details)
         return track_details, vidid
 
     async def playlist(self, url, playid: Union[bool, str] = None):
@@ -93,5 +107,6 @@ class AppleAPI:
                 )
             except:
                 xx = ((item["content"]).split("album/")[1]).split("/")[0]
-            results.append(xx)
+            track_id = self.catalog_id(item["content"])
+            results.append((xx, "apple", track_id) if track_id else xx)
         return results, playlist_id
@@ -31,6 +31,8 @@ import aiohttp
 from bs4 import BeautifulSoup
 from youtubesearchpython.__future__ import VideosSearch
 
+from DeadlineTech.utils.database import get_catalog_match, save_catalog_match
+
 
 class RessoAPI:
     def __init__(self):
@@ -43,9 +45,18 @@ class RessoAPI:
         else:
             return False
 
+    def catalog_id(self, url: str):
+        match = re.search(r"resso\.com/(?:track/)?([A-Za-z0-9_-]+)", url)
+        return match.group(1) if match else None
+
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
+        track_id = self.catalog_id(url)
+        if track_id:
+            matched = await get_catalog_match("resso", track_id)
+            if matched:
+                return matched, matched["vidid"]
         async with aiohttp.ClientSession() as session:
             async with session.get(url) as response:
                 if response.status != 200:
@@ -77,4 +88,6 @@ class RessoAPI:
             "duration_min": duration_min,
             "thumb": thumbnail,
         }
+        if track_id:
+            await save_catalog_match("resso", track_id, track_details)
         return track_details, vidid
@@ -24,13 +24,43 @@
 
 
 
+import asyncio
+import base64
 import re
+import time
 
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
+import aiohttp
 from youtubesearchpython.__future__ import VideosSearch
 
 import config
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.database import get_catalog_match, save_catalog_match
+from DeadlineTech.utils.ttlcache import TTLCache
+
+API_BASE = "https://api.spotify.com/v1"
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+PLAYLIST_PAGE = 100
+ALBUM_PAGE = 50
+PAGE_CONCURRENCY = 4
+MAX_RETRIES = 3
+ALBUM_CACHE_TTL = 86400
+ARTIST_CACHE_TTL = 3600
+
+
+def _query(track: dict) -> str:
+    info = track["name"]
+    for artist in track["artists"]:
+        fetched = f' {artist["name"]}'
+        if "Various Artists" not in fetched:
+            info += fetched
+    return info
+
+
+def _item(track: dict):
+    """A playlist entry: the search query, with the track id for the catalog match store."""
+    if track.get("id"):
+        return _query(track), "spotify", track["id"]
+    return _query(track)
 
 
 class SpotifyAPI:
@@ -38,15 +68,13 @@ class SpotifyAPI:
         self.regex = r"^(https:\/\/open.spotify.com\/)(.*)$"
         self.client_id = config.SPOTIFY_CLIENT_ID
         self.client_secret = config.SPOTIFY_CLIENT_SECRET
-        if config.SPOTIFY_CLIENT_ID and config.SPOTIFY_CLIENT_SECRET:
-            self.client_credentials_manager = SpotifyClientCredentials(
-                self.client_id, self.client_secret
-            )
-            self.spotify = spotipy.Spotify(
-                client_credentials_manager=self.client_credentials_manager
-            )
-        else:
-            self.spotify = None
+        self.spotify = bool(config.SPOTIFY_CLIENT_ID and config.SPOTIFY_CLIENT_SECRET)
+        self._session = None
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = asyncio.Lock()
+        # Playlists are keyed by snapshot_id, so an edited playlist is fetched again.
+        self._cache = TTLCache(256)
 
     async def valid(self, link: str):
         if re.search(self.regex, link):
@@ -54,13 +82,82 @@ class SpotifyAPI:
         else:
             return False
 
+    def _http(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=20),
+                connector=aiohttp.TCPConnector(limit=20),
+            )
+        return self._session
+
+    async def _access_token(self, refresh: bool = False) -> str:
+        async with self._token_lock:
+            if not refresh and self._token and time.time() < self._token_expires:
+                return self._token
+            auth = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+            async with self._http().post(
+                TOKEN_URL,
+                data={"grant_type": "client_credentials"},
+                headers={"Authorization": f"Basic {auth}"},
+            ) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+            self._token = data["access_token"]
+            # Renew a minute early so no request goes out with a token about to lapse.
+            self._token_expires = time.time() + int(data.get("expires_in", 3600)) - 60
+            return self._token
+
+    async def _get(self, path: str, **params) -> dict:
+        refreshed = False
+        for attempt in range(MAX_RETRIES + 1):
+            token = await self._access_token()
+            async with self._http().get(
+                f"{API_BASE}{path}", params=params, headers={"Authorization": f"Bearer {token}"}
+            ) as resp:
+                if resp.status == 401 and not refreshed:
+                    refreshed = True
+                    await self._access_token(refresh=True)
+                    continue
+                if resp.status == 429 or resp.status >= 500:
+                    if attempt == MAX_RETRIES:
+                        resp.raise_for_status()
+                    wait = int(resp.headers.get("Retry-After", 1 + attempt))
+                    LOGGER(__name__).warning(f"Spotify {resp.status} on {path}, retrying in {wait}s")
+                    await asyncio.sleep(wait)
+                    continue
+                resp.raise_for_status()
+                return await resp.json()
+        raise aiohttp.ClientError(f"Spotify request to {path} failed")
+
+    async def _pages(self, path: str, first: int, total: int, page: int, **params) -> list:
+        """Fetches the items at offsets [first, total) with up to PAGE_CONCURRENCY requests at once."""
+        slots = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+        async def fetch(offset):
+            async with slots:
+                data = await self._get(path, offset=offset, limit=min(page, total - offset), **params)
+                return data.get("items") or []
+
+        pages = await asyncio.gather(*(fetch(o) for o in range(first, total, page)))
+        return [item for items in pages for item in items]
+
+    @staticmethod
+    def _id(link: str, kind: str) -> str:
+        match = re.search(rf"{kind}[/:]([A-Za-z0-9]+)", link)
+        return match.group(1) if match else link.split("?")[0].strip("/")
+
+    def catalog_id(self, link: str):
+        match = re.search(r"track[/:]([A-Za-z0-9]{22})", link)
+        return match.group(1) if match else None
+
     async def track(self, link: str):
-        track = self.spotify.track(link)
-        info = track["name"]
-        for artist in track["artists"]:
-            fetched = f' {artist["name"]}'
-            if "Various Artists" not in fetched:
-                info += fetched
+        track_id = self.catalog_id(link)
+        if track_id:
+            matched = await get_catalog_match("spotify", track_id)
+            if matched:
+                return matched, matched["vidid"]
+        track = await self._get(f"/tracks/{self._id(link, 'track')}")
+        info = _query(track)
         results = VideosSearch(info, limit=1)
         for result in (await results.next())["result"]:
             ytlink = result["link"]
@@ -75,50 +172,50 @@ class SpotifyAPI:
             "duration_min": duration_min,
             "thumb": thumbnail,
         }
+        await save_catalog_match("spotify", track_id or track["id"], track_details)
         return track_details, vidid
 
     async def playlist(self, url):
-        playlist = self.spotify.playlist(url)
-        playlist_id = playlist["id"]
-        results = []
-        for item in playlist["tracks"]["items"]:
-            music_track = item["track"]
-            info = music_track["name"]
-            for artist in music_track["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-        return results, playlist_id
+        playlist_id = self._id(url, "playlist")
+        meta = await self._get(f"/playlists/{playlist_id}", fields="id,snapshot_id,tracks.total")
+        key = ("playlist", meta["id"], meta.get("snapshot_id"))
+        results = self._cache.get(key)
+        if results is None:
+            total = min(meta["tracks"]["total"], config.PLAYLIST_FETCH_LIMIT)
+            items = await self._pages(
+                f"/playlists/{playlist_id}/tracks", 0, total, PLAYLIST_PAGE,
+                fields="items(track(id,name,artists(name)))",
+            )
+            # Local files and removed tracks come back with a null track.
+            results = [_item(item["track"]) for item in items if item.get("track")]
+            self._cache.set(key, results)
+        return list(results), meta["id"]
 
     async def album(self, url):
-        album = self.spotify.album(url)
-        album_id = album["id"]
-        results = []
-        for item in album["tracks"]["items"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
+        album_id = self._id(url, "album")
+        key = ("album", album_id)
+        results = self._cache.get(key)
+        if results is None:
+            album = await self._get(f"/albums/{album_id}")
+            album_id = album["id"]
+            total = min(album["tracks"]["total"], config.PLAYLIST_FETCH_LIMIT)
+            items = album["tracks"]["items"][:total]
+            items += await self._pages(f"/albums/{album_id}/tracks", len(items), total, ALBUM_PAGE)
+            results = [_item(item) for item in items]
+            self._cache.set(key, results, ttl=ALBUM_CACHE_TTL)
 
         return (
-            results,
+            list(results),
             album_id,
         )
 
     async def artist(self, url):
-        artistinfo = self.spotify.artist(url)
-        artist_id = artistinfo["id"]
-        results = []
-        artisttoptracks = self.spotify.artist_top_tracks(url)
-        for item in artisttoptracks["tracks"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
-        return results, artist_id
+        artist_id = self._id(url, "artist")
+        key = ("artist", artist_id)
+        results = self._cache.get(key)
+        if results is None:
+            artisttoptracks = await self._get(f"/artists/{artist_id}/top-tracks", market="US")
+            results = [_item(item) for item in artisttoptracks["tracks"]]
+            self._cache.set(key, results, ttl=ARTIST_CACHE_TTL)
+
+        return list(results), artist_id
@@ -1,17 +1,20 @@
 import asyncio
+import json
 import os
 import re
 import time
 import uuid
-import random
+import shutil
 import logging
 import aiohttp
 import aiofiles
-import yt_dlp
 
+from datetime import datetime, timedelta
+from io import BytesIO
+from collections import deque
 from pathlib import Path
-from typing import Union, Optional, Dict, Any, List
-from urllib.parse import urlparse
+from typing import Union, Optional, Dict, Any, List, Tuple
+from urllib.parse import parse_qs, urlparse
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from aiohttp import TCPConnector
@@ -28,8 +31,17 @@ except ImportError:
     Playlist = None
 
 from DeadlineTech import app as TG_APP
+from DeadlineTech.core.mongo import mongodb
 from DeadlineTech.utils.database import is_on_off
 from DeadlineTech.utils.formatters import time_to_seconds
+from DeadlineTech.utils.cookie_pool import cookie_pool
+from DeadlineTech.utils.download_scheduler import NOW_PLAYING, download_scheduler
+from DeadlineTech.utils.media_cache import media_cache
+from DeadlineTech.utils.stream_formats import (
+    BASELINE_AUDIO, BASELINE_STREAM, BASELINE_VIDEO, audio_format, stream_format, video_format,
+)
+from DeadlineTech.utils.ttlcache import TTLCache
+from DeadlineTech.utils.ytdlp_pool import YtdlpError, YtdlpPoolBusy, ytdlp_pool
 from DeadlineTech.core.dir import DOWNLOAD_DIR
 import config
 
@@ -49,22 +61,114 @@ HARD_RETRY_WAIT = 3
 JOB_POLL_ATTEMPTS = 10
 JOB_POLL_INTERVAL = 2.0
 JOB_POLL_BACKOFF = 1.2
+JOB_POLL_MIN_INTERVAL = 0.75
+JOB_POLL_MAX_INTERVAL = 6.0
+# Same overall budget the per-download poll loop used to have.
+JOB_WAIT_TIMEOUT = sum(JOB_POLL_INTERVAL * JOB_POLL_BACKOFF ** i for i in range(JOB_POLL_ATTEMPTS))
 NO_CANDIDATE_WAIT = 4
 CDN_RETRIES = 5
 CDN_RETRY_DELAY = 2
+CDN_CONNECTIONS = 4
+TIER_WINDOW = 20
+TIER_MIN_SAMPLES = 5
+TIER_MIN_SUCCESS_RATE = 0.5
+TIER_CONSECUTIVE_FAILS = 3
+TIER_COOLDOWN = 60
+TIER_MAX_COOLDOWN = 600
+TIER_HEDGE_MIN_DELAY = 1.0
+# Assumed seconds per success until a tier has enough samples of its own.
+TIER_DEFAULT_COST = {"media_db": 1.0, "v2": 15.0, "cookies": 30.0}
+CDN_SEGMENT_MIN = 8 * 1024 * 1024
 HARD_TIMEOUT = 300  
+# A download job keeps running this long even after everyone waiting for it (HARD_TIMEOUT each) gave up.
+DOWNLOAD_JOB_DEADLINE = 900
 TG_FLOOD_COOLDOWN = 0.0
+PROGRESSIVE_PREFIX = config.PROGRESSIVE_PREFIX_KB * 1024
+PROGRESSIVE_CHUNK = 64 * 1024
+# ffmpeg follows a growing file until no data arrives for this long, which is also
+# how long it lingers at the real end of the file before the stream ends.
+PROGRESSIVE_RW_TIMEOUT = 3
+PROGRESSIVE_SEEK_WAIT = 60
+META_CACHE_SIZE = 4096
+MEDIA_HIT_CACHE_SIZE = 4096
+MEDIA_MISS_TTL = 600
+MEDIA_PRELOAD_REFRESH = 900
+MEDIA_UPLOAD_INTERVAL = 3
+DEMUX_TIMEOUT = 60
+MEDIA_UPLOAD_ATTEMPTS = 3
+META_CACHE_TTL = config.YT_META_CACHE_TTL
+SLIDER_PAGE_SIZE = 10
+SLIDER_CACHE_SIZE = 512
+SLIDER_CACHE_TTL = 600
+SLIDER_THUMB_TTL = 3600
+STREAM_URL_FORMAT = stream_format()
+STREAM_URL_CACHE_SIZE = 1024
+# Signed googlevideo URLs are dropped this long before their `expire` timestamp...
+STREAM_URL_MARGIN = 300
+# ...and re-resolved in the background once they get this close to it.
+STREAM_URL_REFRESH = 900
+# Lifetime assumed for URLs that carry no `expire` parameter.
+STREAM_URL_DEFAULT_TTL = 1800
+V2_URL_CACHE_SIZE = 4096
+# Lifetime assumed for API CDN links that carry no `expire` parameter.
+V2_URL_DEFAULT_TTL = 3600
+UNPLAYABLE_CACHE_SIZE = 8192
+# Seconds a failed id is refused, by failure reason.
+UNPLAYABLE_TTL = {
+    "removed": 86400, "private": 21600, "age_restricted": 21600, "geo_blocked": 21600,
+    "upcoming": 300,
+}
+# Failures tied to the video itself one id may have within the window, across all chats, before it is refused for the rest of it.
+UNPLAYABLE_RETRY_BUDGET = 3
+UNPLAYABLE_RETRY_WINDOW = 3600
 
 # Regex
 YOUTUBE_ID_RE = re.compile(r"^[a-zA-Z0-9_-]{11}$")
+STREAM_EXPIRE_PATH_RE = re.compile(r"/expire/(\d+)")
 YOUTUBE_ID_IN_URL_RE = re.compile(r"""(?x)(?:v=|\/)([A-Za-z0-9_-]{11})|youtu\.be\/([A-Za-z0-9_-]{11})""")
+# yt-dlp error fragments per failure reason, checked in order.
+UNPLAYABLE_PATTERNS = (
+    ("private", ("private video",)),
+    ("age_restricted", ("confirm your age", "age-restricted", "age restricted", "inappropriate for some users")),
+    ("geo_blocked", ("in your country", "geo restrict", "geo-restrict")),
+    ("upcoming", ("live event will begin", "premieres in", "premiere will begin")),
+    ("removed", ("video unavailable", "has been removed", "no longer available", "has been terminated", "does not exist")),
+)
+UNPLAYABLE_MESSAGES = {
+    "removed": "the video was removed or is unavailable",
+    "private": "the video is private",
+    "age_restricted": "the video is age-restricted",
+    "geo_blocked": "the video is blocked in the bot's region",
+    "upcoming": "the stream or premiere has not started yet",
+    "retry_budget": "it failed too often recently",
+}
 
 # Globals
-_inflight: Dict[str, asyncio.Future] = {}
-_inflight_lock = asyncio.Lock()
 _session: Optional[aiohttp.ClientSession] = None
 _session_lock = asyncio.Lock()
 _MONGO_CLIENT: Optional[AsyncIOMotorClient] = None
+_growing: Dict[str, "_GrowingFile"] = {}
+_media_hits = TTLCache(MEDIA_HIT_CACHE_SIZE)
+_media_misses = TTLCache(MEDIA_HIT_CACHE_SIZE * 4, MEDIA_MISS_TTL)
+_media_known_ids: Optional[set] = None
+_media_preload_task: Optional[asyncio.Task] = None
+_media_indexes_ready = False
+_upload_queue: asyncio.Queue = asyncio.Queue(maxsize=config.MEDIA_UPLOAD_BACKLOG)
+_upload_queued: set = set()
+_upload_task: Optional[asyncio.Task] = None
+_meta_cache = TTLCache(META_CACHE_SIZE, META_CACHE_TTL)
+_meta_inflight: Dict[str, asyncio.Future] = {}
+_meta_index_ready = False
+_slider_pages = TTLCache(SLIDER_CACHE_SIZE, SLIDER_CACHE_TTL)
+_slider_inflight: Dict[str, asyncio.Future] = {}
+_slider_thumbs = TTLCache(SLIDER_CACHE_SIZE * SLIDER_PAGE_SIZE, SLIDER_THUMB_TTL)
+_slider_thumb_tasks: Dict[str, asyncio.Task] = {}
+_stream_urls = TTLCache(STREAM_URL_CACHE_SIZE)
+_stream_url_refresh: Dict[tuple, asyncio.Task] = {}
+_v2_urls = TTLCache(V2_URL_CACHE_SIZE)
+_v2_url_index_ready = False
+_unplayable = TTLCache(UNPLAYABLE_CACHE_SIZE)
+_unplayable_attempts = TTLCache(UNPLAYABLE_CACHE_SIZE)
 
 # Configure Logger
 logging.basicConfig(
@@ -74,15 +178,28 @@ logging.basicConfig(
 LOGGER = logging.getLogger("YouTubeAPI")
 
 # === Statistics System ===
-DOWNLOAD_STATS: Dict[str, int] = {
+DOWNLOAD_STATS: Dict[str, Any] = {
     "total": 0, "success": 0, "failed": 0,
-    "db_hit": 0, "v2_success": 0, "cookie_success": 0,
-    "api_fail_5xx": 0, "network_fail": 0, "timeout_fail": 0
+    "cache_hit": 0, "db_hit": 0, "v2_success": 0, "cookie_success": 0,
+    "api_fail_5xx": 0, "network_fail": 0, "timeout_fail": 0,
+    "job_polls": 0, "jobs_completed": 0, "jobs_expired": 0,
+    "uploads": 0, "uploads_skipped": 0, "uploads_failed": 0, "uploads_dropped": 0,
+    "audio_derived": 0, "hedges": 0, "hedge_wins": 0,
+    "stream_url_hit": 0, "stream_url_refresh": 0, "unplayable_hit": 0,
+    "cdn_url_hit": 0, "cdn_url_stale": 0,
 }
 
 def _inc(key: str):
     DOWNLOAD_STATS[key] = DOWNLOAD_STATS.get(key, 0) + 1
 
+class UnplayableError(Exception):
+    """Raised for ids that recently failed every tier; `message` says why."""
+    def __init__(self, vid: str, reason: str):
+        self.vid = vid
+        self.reason = reason
+        self.message = UNPLAYABLE_MESSAGES.get(reason, reason)
+        super().__init__(f"{vid} is unplayable: {self.message}")
+
 class V2HardAPIError(Exception):
     def __init__(self, status: int, body_preview: str = ""):
         super().__init__(f"Hard API error status={status}")
@@ -105,10 +222,8 @@ def extract_video_id(link: str) -> str:
     return ""
 
 def cookie_txt_file():
-    cookie_dir = f"{os.getcwd()}/cookies"
-    if not os.path.exists(cookie_dir): return None
-    files = [f for f in os.listdir(cookie_dir) if f.endswith(".txt")]
-    return os.path.join(cookie_dir, random.choice(files)) if files else None
+    """Healthiest usable cookie file; report the outcome via cookie_pool.report()."""
+    return cookie_pool.pick()
 
 def sec_to_min(sec):
     """Converts seconds (int) to MM:SS string."""
@@ -152,27 +267,88 @@ def _get_media_collection():
         _MONGO_CLIENT = AsyncIOMotorClient(DB_URI)
     return _MONGO_CLIENT[MEDIA_DB_NAME][MEDIA_COLLECTION_NAME]
 
-async def is_media(track_id: str, isVideo: bool = False) -> bool:
-    col = _get_media_collection()
-    if col is None: return False
-    doc = await col.find_one({
-        "$or": [
-            {"track_id": track_id, "isVideo": isVideo},
-            {"track_id": f"{track_id}.{'mp4' if isVideo else 'mp3'}"}
-        ]
-    }, {"_id": 1})
-    return bool(doc)
+# === Media Catalog Lookup ===
+
+def _media_candidates(track_id: str, is_video: bool) -> List[tuple]:
+    """Stored track_id spellings in lookup priority, and whether isVideo must match."""
+    ext = "mp4" if is_video else "mp3"
+    suffixed = f"{track_id}_{'v' if is_video else 'a'}"
+    return [
+        (f"{track_id}.{ext}", True), (f"{track_id}.{ext}.{ext}", False),
+        (track_id, True), (f"{track_id}.{ext}", False),
+        (suffixed, True), (f"{suffixed}.{ext}", False),
+    ]
+
+def _media_base_id(stored: str) -> str:
+    base = str(stored)
+    for _ in range(2):
+        for suffix in (".mp3", ".mp4", "_a", "_v"):
+            if base.endswith(suffix): base = base[: -len(suffix)]
+    return base
+
+async def _ensure_media_indexes(col) -> None:
+    global _media_indexes_ready
+    if _media_indexes_ready: return
+    _media_indexes_ready = True
+    try:
+        await col.create_index([("track_id", 1), ("isVideo", 1)])
+    except Exception as e:
+        LOGGER.warning(f"⚠️ Could not ensure media indexes: {e}")
+
+async def _preload_media_ids() -> None:
+    global _media_known_ids
+    while True:
+        col = _get_media_collection()
+        if col is None: return
+        try:
+            known = set()
+            async for doc in col.find({}, {"track_id": 1, "_id": 0}):
+                if doc.get("track_id"): known.add(_media_base_id(doc["track_id"]))
+            _media_known_ids = known
+            LOGGER.info(f"📚 Media catalog preloaded: {len(known)} tracks")
+        except Exception as e:
+            LOGGER.warning(f"⚠️ Media catalog preload failed: {e}")
+        await asyncio.sleep(MEDIA_PRELOAD_REFRESH)
+
+def _remember_media(track_id: str, is_video: bool, message_id: int) -> None:
+    _media_hits.set((track_id, is_video), message_id)
+    _media_misses.pop((track_id, is_video))
+    if _media_known_ids is not None: _media_known_ids.add(track_id)
+
+async def lookup_media(track_id: str, is_video: bool) -> Optional[int]:
+    """Resolves every key variant with a single indexed query, with hit/miss caching."""
+    global _media_preload_task
+    key = (track_id, is_video)
+    if msg_id := _media_hits.get(key): return msg_id
+    if key in _media_misses: return None
+    if config.MEDIA_DB_PRELOAD and _media_preload_task is None:
+        _media_preload_task = asyncio.create_task(_preload_media_ids())
+    if _media_known_ids is not None and track_id not in _media_known_ids:
+        _media_misses.set(key, True)
+        return None
 
-async def get_media_id(track_id: str, isVideo: bool = False) -> Optional[int]:
     col = _get_media_collection()
     if col is None: return None
-    doc = await col.find_one({
-        "$or": [
-            {"track_id": track_id, "isVideo": isVideo},
-            {"track_id": f"{track_id}.{'mp4' if isVideo else 'mp3'}"}
-        ]
-    }, {"message_id": 1})
-    return int(doc.get("message_id")) if doc and doc.get("message_id") else None
+    await _ensure_media_indexes(col)
+    candidates = _media_candidates(track_id, is_video)
+    try:
+        docs = await col.find(
+            {"track_id": {"$in": list({c[0] for c in candidates})}},
+            {"_id": 0, "track_id": 1, "isVideo": 1, "message_id": 1},
+        ).to_list(length=20)
+    except Exception as e:
+        LOGGER.warning(f"⚠️ Media lookup failed: {e}")
+        return None
+
+    for stored_id, strict in candidates:
+        for doc in docs:
+            if doc.get("track_id") != stored_id or not doc.get("message_id"): continue
+            if strict and bool(doc.get("isVideo")) != is_video: continue
+            msg_id = int(doc["message_id"])
+            _media_hits.set(key, msg_id)
+            return msg_id
+    _media_misses.set(key, True)
+    return None
 
 async def _download_from_media_db(track_id: str, is_video: bool) -> Optional[str]:
     global TG_FLOOD_COOLDOWN
@@ -181,14 +357,7 @@ async def _download_from_media_db(track_id: str, is_video: bool) -> Optional[str
     if time.time() < TG_FLOOD_COOLDOWN: return None 
 
     ext = "mp4" if is_video else "mp3"
-    msg_id = None
-    keys = [f"{track_id}.{ext}", track_id, f"{track_id}_{'v' if is_video else 'a'}"]
-    
-    for k in keys:
-        if await is_media(k, isVideo=is_video):
-            msg_id = await get_media_id(k, isVideo=is_video)
-            break
-            
+    msg_id = await lookup_media(track_id, is_video)
     if not msg_id: return None
 
     LOGGER.info(f"📂 Database HIT: {track_id}")
@@ -226,6 +395,87 @@ async def _download_from_media_db(track_id: str, is_video: bool) -> Optional[str
     
     return None
 
+# === Media Channel Uploader ===
+
+def _queue_media_upload(track_id: str, is_video: bool, path: str) -> None:
+    """Schedules a fresh download for upload to the media channel (write-through)."""
+    global _upload_task
+    if not config.MEDIA_UPLOAD or not track_id or not path: return
+    if not TG_APP or not MEDIA_CHANNEL_ID or _get_media_collection() is None: return
+    key = (track_id, is_video)
+    if key in _upload_queued or _media_hits.get(key): return
+    try:
+        _upload_queue.put_nowait((track_id, is_video, path))
+    except asyncio.QueueFull:
+        _inc("uploads_dropped")
+        return
+    _upload_queued.add(key)
+    if _upload_task is None or _upload_task.done():
+        _upload_task = asyncio.create_task(_upload_worker())
+
+async def _upload_worker() -> None:
+    while True:
+        track_id, is_video, path = await _upload_queue.get()
+        try:
+            await _upload_media(track_id, is_video, path)
+        except Exception as e:
+            _inc("uploads_failed")
+            LOGGER.warning(f"⚠️ Media upload failed for {track_id}: {e}")
+        finally:
+            _upload_queued.discard((track_id, is_video))
+        await asyncio.sleep(MEDIA_UPLOAD_INTERVAL)
+
+async def _upload_media(track_id: str, is_video: bool, path: str) -> None:
+    global TG_FLOOD_COOLDOWN
+    gf = _growing_file(path)
+    if gf:
+        await gf.done.wait()
+        if not gf.ok: return
+        path = gf.final_path
+    if not os.path.isfile(path): return
+    limit = config.TG_VIDEO_FILESIZE_LIMIT if is_video else config.TG_AUDIO_FILESIZE_LIMIT
+    if os.path.getsize(path) > limit: return
+
+    # Another node (or an earlier run) may have uploaded it since it was queued.
+    _media_misses.pop((track_id, is_video))
+    if await lookup_media(track_id, is_video):
+        _inc("uploads_skipped")
+        return
+
+    col = _get_media_collection()
+    # Name it after the real container (m4a, webm, mkv, ...), not a fixed mp3/mp4.
+    ext = os.path.splitext(path)[1] or (".mp4" if is_video else ".mp3")
+    for _ in range(MEDIA_UPLOAD_ATTEMPTS):
+        wait = TG_FLOOD_COOLDOWN - time.time()
+        if wait > 0: await asyncio.sleep(wait)
+        try:
+            if is_video:
+                msg = await TG_APP.send_video(int(MEDIA_CHANNEL_ID), path, caption=track_id, file_name=f"{track_id}{ext}")
+            else:
+                msg = await TG_APP.send_audio(int(MEDIA_CHANNEL_ID), path, caption=track_id, file_name=f"{track_id}{ext}")
+            break
+        except FloodWait as e:
+            TG_FLOOD_COOLDOWN = time.time() + e.value + 5
+            LOGGER.warning(f"⚠️ FloodWait on upload: {e.value}s")
+    else:
+        _inc("uploads_failed")
+        return
+
+    res = await col.update_one(
+        {"track_id": track_id, "isVideo": is_video},
+        {"$setOnInsert": {"message_id": msg.id}},
+        upsert=True,
+    )
+    if res.upserted_id is None:
+        # Lost a race with another node; keep its copy and drop ours.
+        try: await msg.delete()
+        except Exception: pass
+        _inc("uploads_skipped")
+        return
+    _remember_media(track_id, is_video, msg.id)
+    _inc("uploads")
+    LOGGER.info(f"📤 Uploaded {track_id} to media channel")
+
 # === V2 API Helpers (Downloads) ===
 
 def _extract_candidate(obj: Any) -> Optional[str]:
@@ -254,41 +504,263 @@ def _normalize_candidate_to_url(candidate: str) -> Optional[str]:
     if c.startswith("/root/") or c.startswith("/home/"): return None
     return f"{API_URL.rstrip('/')}/{c.lstrip('/')}"
 
+# === Ranged CDN Downloader ===
+
+class _CdnDownload:
+    """One CDN transfer into `<out_path>.dl`, resumable across attempts and cycles."""
+
+    def __init__(self, out_path: str):
+        self.out_path = out_path
+        self.tmp_path = out_path + ".dl"
+        self.state_path = self.tmp_path + ".json"
+        self.total: Optional[int] = None
+        self.ranged = False
+        self.segments: List[List[int]] = []  # [start, end (-1 = until EOF), bytes done]
+
+    def prepare(self, total: Optional[int], ranged: bool) -> None:
+        # Resume a previous attempt only if it was for a file of the same size.
+        try:
+            with open(self.state_path) as f:
+                saved = json.load(f)
+            if total and saved.get("total") == total and os.path.exists(self.tmp_path):
+                self.total, self.ranged, self.segments = total, saved["ranged"], saved["segments"]
+                LOGGER.info(f"↩️ Resuming CDN Download: {self.out_path} ({self.written()}/{total})")
+                return
+        except Exception:
+            pass
+        self.total, self.ranged = total, ranged
+        if total and ranged and total >= CDN_SEGMENT_MIN:
+            size = -(-total // CDN_CONNECTIONS)
+            self.segments = [[s, min(s + size, total) - 1, 0] for s in range(0, total, size)]
+        else:
+            self.segments = [[0, total - 1 if total else -1, 0]]
+        with open(self.tmp_path, "wb") as f:
+            if total: f.truncate(total)
+
+    def written(self) -> int:
+        return sum(seg[2] for seg in self.segments)
+
+    def complete(self) -> bool:
+        return bool(self.segments) and all(
+            seg[1] >= 0 and seg[2] >= seg[1] - seg[0] + 1 for seg in self.segments
+        )
+
+    def save(self) -> None:
+        if not self.segments or not self.ranged: return
+        try:
+            with open(self.state_path, "w") as f:
+                json.dump({"total": self.total, "ranged": self.ranged, "segments": self.segments}, f)
+        except Exception:
+            pass
+
+    def discard(self) -> None:
+        for p in (self.tmp_path, self.state_path):
+            try: os.remove(p)
+            except FileNotFoundError: pass
+        self.segments = []
+
+    def commit(self) -> Optional[str]:
+        size = os.path.getsize(self.tmp_path) if os.path.exists(self.tmp_path) else 0
+        if not size or (self.total is not None and (size != self.total or self.written() != self.total)):
+            LOGGER.warning(f"⚠️ CDN length mismatch for {self.out_path}: {size}/{self.total}")
+            self.discard()
+            return None
+        os.replace(self.tmp_path, self.out_path)
+        try: os.remove(self.state_path)
+        except FileNotFoundError: pass
+        return self.out_path
+
+async def _probe_cdn(session: aiohttp.ClientSession, url: str):
+    """Returns (total size or None, whether Range requests are honoured)."""
+    async with download_scheduler.host_slot(url), session.get(url, headers={"Range": "bytes=0-0"}, timeout=HARD_TIMEOUT) as resp:
+        if resp.status == 206:
+            total = resp.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+            return (int(total) if total.isdigit() else None), True
+        if resp.status == 200:
+            return resp.content_length, False
+        raise ValueError(f"CDN status={resp.status}")
+
+async def _fetch_segment(session: aiohttp.ClientSession, url: str, dl: _CdnDownload, seg: List[int]) -> None:
+    start, end = seg[0], seg[1]
+    if not dl.ranged: seg[2] = 0  # No Range support: a retry starts over.
+    headers = {"Range": f"bytes={start + seg[2]}-{end if end >= 0 else ''}"} if dl.ranged else None
+    async with download_scheduler.host_slot(url), session.get(url, headers=headers, timeout=HARD_TIMEOUT) as resp:
+        if resp.status == 200 and start + seg[2] > 0: raise ValueError("Range ignored")
+        if resp.status not in (200, 206): raise ValueError(f"CDN status={resp.status}")
+        async with aiofiles.open(dl.tmp_path, "r+b") as f:
+            await f.seek(start + seg[2])
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                if end >= 0: chunk = chunk[: end + 1 - (start + seg[2])]
+                if not chunk: break
+                await download_scheduler.throttle(len(chunk))
+                await f.write(chunk)
+                seg[2] += len(chunk)
+            if end < 0: await f.truncate(start + seg[2])
+    if end < 0:
+        seg[1] = start + seg[2] - 1  # Size was unknown: the stream ending marks completion.
+
 async def _download_from_cdn(cdn_url: str, out_path: str) -> Optional[str]:
     if not cdn_url: return None
     
     LOGGER.info(f"⬇️ CDN Download: {out_path}")
+    _ensure_dir(str(Path(out_path).parent))
+    dl = _CdnDownload(out_path)
     for attempt in range(1, CDN_RETRIES + 1):
         try:
             session = await get_http_session()
-            async with session.get(cdn_url, timeout=HARD_TIMEOUT) as resp:
-                if resp.status != 200:
-                    if attempt < CDN_RETRIES:
-                        await asyncio.sleep(CDN_RETRY_DELAY)
-                        continue
-                    return None
-                
-                _ensure_dir(str(Path(out_path).parent))
-                async with aiofiles.open(out_path, "wb") as f:
-                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
-                        if not chunk: break
-                        await f.write(chunk)
-            
-            if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
-                return out_path
+            if not dl.segments:
+                total, ranged = await _probe_cdn(session, cdn_url)
+                dl.prepare(total, ranged)
+            pending = [seg for seg in dl.segments if not (seg[1] >= 0 and seg[2] >= seg[1] - seg[0] + 1)]
+            results = await asyncio.gather(
+                *(_fetch_segment(session, cdn_url, dl, seg) for seg in pending), return_exceptions=True
+            )
+            if any(isinstance(r, Exception) for r in results): _inc("network_fail")
+            if dl.complete():
+                path = dl.commit()
+                if path: return path
+            else:
+                dl.save()
+        except asyncio.CancelledError:
+            dl.save()
+            raise
         except Exception:
             _inc("network_fail")
-            if attempt < CDN_RETRIES: await asyncio.sleep(CDN_RETRY_DELAY)
+            dl.save()
+        if attempt < CDN_RETRIES: await asyncio.sleep(CDN_RETRY_DELAY)
     return None
 
-async def _v2_request_json(endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+# === Progressive Playback ===
+
+class _GrowingFile:
+    """A CDN download that is being played while it is still being written."""
+
+    def __init__(self, part_path: str, final_path: str, vid: str, kind: str):
+        self.part_path = part_path
+        self.final_path = final_path
+        self.vid = vid
+        self.kind = kind
+        self.written = 0
+        self.total: Optional[int] = None
+        self.ok = False
+        self.done = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+def _growing_file(path: Optional[str]) -> Optional[_GrowingFile]:
+    if not path: return None
+    return _growing.get(os.path.abspath(str(path)))
+
+async def _fill_growing_file(cdn_url: str, gf: _GrowingFile) -> None:
+    try:
+        if os.path.exists(gf.part_path): os.remove(gf.part_path)
+        for attempt in range(1, CDN_RETRIES + 1):
+            # A resume must not recreate a .part its queue entry already removed.
+            if gf.written and not os.path.exists(gf.part_path): return
+            try:
+                headers = {"Range": f"bytes={gf.written}-"} if gf.written else None
+                session = await get_http_session()
+                async with download_scheduler.host_slot(cdn_url), session.get(cdn_url, headers=headers, timeout=HARD_TIMEOUT) as resp:
+                    if resp.status not in (200, 206): raise ValueError(f"status={resp.status}")
+                    # A server that ignores Range resends from zero: drop what we already have.
+                    skip = gf.written if resp.status == 200 else 0
+                    if gf.total is None and resp.content_length:
+                        gf.total = resp.content_length + (gf.written if resp.status == 206 else 0)
+                    async with aiofiles.open(gf.part_path, "ab") as f:
+                        async for chunk in resp.content.iter_chunked(PROGRESSIVE_CHUNK):
+                            if not os.path.exists(gf.part_path):
+                                # Its queue entry was dropped (skip/stop) and the .part removed:
+                                # give the host slot, bandwidth and download slot back now.
+                                LOGGER.info(f"🗑️ Progressive download abandoned: {gf.final_path}")
+                                return
+                            if skip:
+                                cut = min(skip, len(chunk))
+                                chunk, skip = chunk[cut:], skip - cut
+                                if not chunk: continue
+                            await download_scheduler.throttle(len(chunk))
+                            await f.write(chunk)
+                            await f.flush()
+                            gf.written += len(chunk)
+                if gf.written and (gf.total is None or gf.written >= gf.total):
+                    gf.ok = True
+                    break
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                _inc("network_fail")
+            if attempt < CDN_RETRIES: await asyncio.sleep(CDN_RETRY_DELAY)
+
+        if gf.ok:
+            # Keep the .part name alive for the ffmpeg process and queue entry that use it.
+            try:
+                os.link(gf.part_path, gf.final_path)
+            except FileExistsError:
+                pass
+            except FileNotFoundError:
+                # The .part was removed after its last chunk was written.
+                gf.ok = False
+            except OSError:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, shutil.copyfile, gf.part_path, gf.final_path
+                )
+            if gf.ok and gf.vid: media_cache.put(gf.vid, gf.kind, gf.final_path)
+    finally:
+        gf.done.set()
+        _growing.pop(os.path.abspath(gf.part_path), None)
+        _growing.pop(os.path.abspath(gf.final_path), None)
+
+async def _await_growing(gf: _GrowingFile, progressive: bool) -> Optional[str]:
+    if progressive:
+        while gf.written < PROGRESSIVE_PREFIX and not gf.done.is_set():
+            await asyncio.sleep(0.1)
+    else:
+        await gf.done.wait()
+    if gf.done.is_set():
+        return gf.final_path if gf.ok else None
+    return gf.part_path
+
+async def _start_progressive(cdn_url: str, out_path: str, vid: str, kind: str) -> Optional[str]:
+    gf = _GrowingFile(out_path + ".part", out_path, vid, kind)
+    _growing[os.path.abspath(gf.part_path)] = gf
+    _growing[os.path.abspath(gf.final_path)] = gf
+    _ensure_dir(str(Path(out_path).parent))
+    LOGGER.info(f"⏩ Progressive CDN Download: {out_path}")
+    gf.task = asyncio.create_task(_fill_growing_file(cdn_url, gf))
+    return await _await_growing(gf, True)
+
+async def _release_when_filled(gf: _GrowingFile, granted: int) -> None:
+    try:
+        await gf.done.wait()
+    finally:
+        download_scheduler.release(granted)
+
+def progressive_ffmpeg_params(path: Optional[str]) -> str:
+    """Extra ffmpeg input options for a file that is still being downloaded."""
+    gf = _growing_file(path)
+    if gf and not gf.done.is_set():
+        return f"-follow 1 -rw_timeout {PROGRESSIVE_RW_TIMEOUT * 1000000}"
+    return ""
+
+async def wait_until_buffered(path: Optional[str], position: Optional[int] = None,
+                              duration: Optional[int] = None, timeout: float = PROGRESSIVE_SEEK_WAIT) -> bool:
+    """Waits until `position` (seconds) of a growing file is on disk, or the whole file if not given."""
+    gf = _growing_file(path)
+    if not gf: return True
+    deadline = time.monotonic() + timeout
+    while not gf.done.is_set() and time.monotonic() < deadline:
+        if position is not None and duration and gf.total:
+            needed = gf.total * min(1.0, (position + 10) / duration)
+            if gf.written >= needed: return True
+        await asyncio.sleep(0.25)
+    return gf.done.is_set() and gf.ok
+
+async def _v2_request_json(endpoint: str, params: Dict[str, Any], retries: int = V2_HTTP_RETRIES) -> Optional[Any]:
     if not API_URL or not API_KEY: return None
     
     base = API_URL.rstrip("/")
     url = f"{base}/{endpoint.lstrip('/')}"
     params["api_key"] = API_KEY
 
-    for attempt in range(1, V2_HTTP_RETRIES + 1):
+    for attempt in range(1, retries + 1):
         try:
             session = await get_http_session()
             async with session.get(url, params=params, headers={"X-API-Key": API_KEY}) as resp:
@@ -300,17 +772,196 @@ async def _v2_request_json(endpoint: str, params: Dict[str, Any]) -> Optional[An
         except V2HardAPIError: raise
         except Exception: _inc("network_fail")
         
-        if attempt < V2_HTTP_RETRIES: await asyncio.sleep(1)
+        if attempt < retries: await asyncio.sleep(1)
     return None
 
-async def v2_download_process(link: str, video: bool) -> Optional[str]:
+def _v2_failure_reason(resp: Any) -> Optional[str]:
+    """Unplayable reason of a failed V2 request or job, when its error message names one."""
+    if not isinstance(resp, dict) or str(resp.get("status", "")).lower() not in ("failed", "error"): return None
+    return _unplayable_reason(str(resp.get("error") or resp.get("message") or resp.get("detail") or ""))
+
+# === Shared Job Poller ===
+
+class _JobPoller:
+    """Polls every outstanding V2 job from one task.
+
+    The schedule follows an EWMA of observed job completion times: the first
+    poll lands just before a typical job finishes, later polls are dense around
+    that point and back off for jobs that run long.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.typical = JOB_POLL_INTERVAL * 2
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+
+    def _next_delay(self, age: float, polls: int) -> float:
+        if polls == 0:
+            delay = self.typical * 0.8
+        elif age < self.typical * 2:
+            delay = self.typical * 0.25
+        else:
+            delay = self.typical * 0.25 * (JOB_POLL_BACKOFF ** (polls - 1))
+        return min(max(delay, JOB_POLL_MIN_INTERVAL), JOB_POLL_MAX_INTERVAL)
+
+    async def wait(self, job_id: str) -> Optional[str]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            now = time.monotonic()
+            job = self.jobs[job_id] = {
+                "future": asyncio.get_running_loop().create_future(),
+                "submitted": now, "next_poll": now + self._next_delay(0, 0),
+                "polls": 0, "waiters": 0,
+            }
+        job["waiters"] += 1
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        self.wakeup.set()
+        try:
+            return await asyncio.shield(job["future"])
+        finally:
+            job["waiters"] -= 1
+            if job["waiters"] <= 0 and not job["future"].done():
+                self.jobs.pop(job_id, None)
+
+    def _finish(self, job_id: str, candidate: Optional[str], error: Optional[Exception] = None) -> None:
+        job = self.jobs.pop(job_id, None)
+        if not job or job["future"].done(): return
+        if error: job["future"].set_exception(error)
+        else: job["future"].set_result(candidate)
+
+    async def _poll(self, job_id: str) -> None:
+        job = self.jobs.get(job_id)
+        if not job: return
+        job["polls"] += 1
+        _inc("job_polls")
+        try:
+            status = await _v2_request_json("youtube/jobStatus", {"job_id": job_id}, retries=1)
+        except V2HardAPIError:
+            return self._finish(job_id, None)
+        except Exception as e:
+            LOGGER.warning(f"Job status poll failed for {job_id}: {e}")
+            status = None
+        age = time.monotonic() - job["submitted"]
+        candidate = _extract_candidate(status)
+        if candidate and not _looks_like_status_text(candidate):
+            _inc("jobs_completed")
+            self.typical = 0.8 * self.typical + 0.2 * age
+            return self._finish(job_id, candidate)
+        if isinstance(status, dict) and str(status.get("status", "")).lower() in ("failed", "error"):
+            reason = _v2_failure_reason(status)
+            return self._finish(job_id, None, _TierUnplayable(reason) if reason else None)
+        if age >= JOB_WAIT_TIMEOUT:
+            _inc("jobs_expired")
+            return self._finish(job_id, None)
+        job["next_poll"] = time.monotonic() + self._next_delay(age, job["polls"])
+
+    async def _run(self) -> None:
+        while self.jobs:
+            now = time.monotonic()
+            due = [job_id for job_id, job in self.jobs.items() if job["next_poll"] <= now]
+            if due: await asyncio.gather(*(self._poll(job_id) for job_id in due), return_exceptions=True)
+            if not self.jobs: break
+            self.wakeup.clear()
+            sleep_for = min(job["next_poll"] for job in self.jobs.values()) - time.monotonic()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), max(0.0, sleep_for))
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        completed = DOWNLOAD_STATS.get("jobs_completed", 0)
+        return {
+            "outstanding": len(self.jobs),
+            "typical_job_seconds": round(self.typical, 2),
+            "polls_per_completed_job": round(DOWNLOAD_STATS.get("job_polls", 0) / completed, 2) if completed else None,
+        }
+
+_job_poller = _JobPoller()
+
+# === V2 CDN URL Cache ===
+
+def _v2_url_ttl(url: str) -> float:
+    expiry = _stream_url_expiry(url)
+    return expiry - time.time() - STREAM_URL_MARGIN if expiry else V2_URL_DEFAULT_TTL
+
+async def _v2_url_get(vid: str, kind: str) -> Optional[str]:
+    url = _v2_urls.get((vid, kind))
+    if url or not config.V2_URL_MONGO_CACHE: return url
+    try:
+        doc = await mongodb.ytcdn.find_one({"_id": f"{kind}:{vid}"})
+    except Exception:
+        return None
+    if not doc or doc.get("expires", 0) - STREAM_URL_MARGIN < time.time(): return None
+    _v2_urls.set((vid, kind), doc["url"], doc["expires"] - STREAM_URL_MARGIN - time.time())
+    return doc["url"]
+
+async def _v2_url_set(vid: str, kind: str, url: str) -> None:
+    global _v2_url_index_ready
+    ttl = _v2_url_ttl(url)
+    if ttl <= 0: return
+    _v2_urls.set((vid, kind), url, ttl)
+    if not config.V2_URL_MONGO_CACHE: return
+    expires = time.time() + ttl + STREAM_URL_MARGIN
+    try:
+        if not _v2_url_index_ready:
+            await mongodb.ytcdn.create_index("expires_at", expireAfterSeconds=0)
+            _v2_url_index_ready = True
+        await mongodb.ytcdn.update_one(
+            {"_id": f"{kind}:{vid}"},
+            {"$set": {"url": url, "expires": expires, "expires_at": datetime.utcfromtimestamp(expires)}},
+            upsert=True,
+        )
+    except Exception as e:
+        LOGGER.warning(f"⚠️ CDN URL cache write failed: {e}")
+
+async def _cdn_link_alive(url: str) -> bool:
+    try:
+        session = await get_http_session()
+        await _probe_cdn(session, url)
+        return True
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        return False
+
+async def _v2_url_forget(vid: str, kind: str) -> None:
+    _v2_urls.pop((vid, kind))
+    if not config.V2_URL_MONGO_CACHE: return
+    try:
+        await mongodb.ytcdn.delete_one({"_id": f"{kind}:{vid}"})
+    except Exception:
+        pass
+
+async def v2_download_process(link: str, video: bool, progressive: bool = False) -> Optional[str]:
     vid = extract_video_id(link)
     query = vid or link
     ext = "mp4" if video else "m4a"
     base_name = vid if vid else uuid.uuid4().hex[:10]
     out_path = os.path.join(str(Path(DOWNLOAD_DIR)), f"{base_name}.{ext}")
     
-    if os.path.exists(out_path): return out_path
+    if gf := _growing_file(out_path): return await _await_growing(gf, progressive)
+    # Only completed, length-checked transfers are ever renamed to out_path.
+    if os.path.exists(out_path) and os.path.getsize(out_path) > 0: return out_path
+
+    kind = "video" if video else "audio"
+
+    async def _transfer(url: str) -> Optional[str]:
+        if progressive: return await _start_progressive(url, out_path, vid, kind)
+        return await _download_from_cdn(url, out_path)
+
+    # A CDN link handed out earlier (here or on another node) skips the job round-trips.
+    cached_url = await _v2_url_get(vid, kind) if vid else None
+    if cached_url:
+        # One probe decides: an expired or revoked link goes straight to a new job
+        # instead of through the transfer's retry loop.
+        path = await _transfer(cached_url) if await _cdn_link_alive(cached_url) else None
+        if path:
+            _inc("cdn_url_hit")
+            return path
+        _inc("cdn_url_stale")
+        await _v2_url_forget(vid, kind)
 
     LOGGER.info(f"🔄 V2 API Process: {query}")
 
@@ -322,6 +973,8 @@ async def v2_download_process(link: str, video: bool) -> Optional[str]:
         if not resp:
             if cycle < V2_DOWNLOAD_CYCLES: await asyncio.sleep(1); continue
             return None
+        reason = _v2_failure_reason(resp)
+        if reason: raise _TierUnplayable(reason)
             
         candidate = _extract_candidate(resp)
         if candidate and _looks_like_status_text(candidate): candidate = None
@@ -329,13 +982,7 @@ async def v2_download_process(link: str, video: bool) -> Optional[str]:
         job_id = resp.get("job_id") if isinstance(resp, dict) else None
         
         if job_id and not candidate:
-            interval = JOB_POLL_INTERVAL
-            for _ in range(JOB_POLL_ATTEMPTS):
-                await asyncio.sleep(interval)
-                status = await _v2_request_json("youtube/jobStatus", {"job_id": job_id})
-                candidate = _extract_candidate(status)
-                if candidate and not _looks_like_status_text(candidate): break
-                interval *= JOB_POLL_BACKOFF
+            candidate = await _job_poller.wait(str(job_id))
 
         if not candidate:
             if cycle < V2_DOWNLOAD_CYCLES: await asyncio.sleep(NO_CANDIDATE_WAIT); continue
@@ -343,31 +990,625 @@ async def v2_download_process(link: str, video: bool) -> Optional[str]:
             
         final_url = _normalize_candidate_to_url(candidate)
         if final_url:
-            path = await _download_from_cdn(final_url, out_path)
-            if path: return path
+            path = await _transfer(final_url)
+            if path:
+                if vid: asyncio.create_task(_v2_url_set(vid, kind, final_url))
+                return path
 
     return None
 
-# === De-duplication ===
+# === Metadata Cache ===
+
+def _meta_key(link: str) -> str:
+    s = (link or "").strip()
+    if YOUTUBE_ID_RE.match(s) or re.search(r"(?:youtube\.com|youtu\.be)", s):
+        vid = extract_video_id(s)
+        if vid: return f"id:{vid}"
+    return "q:" + " ".join(s.lower().split())
+
+def _meta_from_search(r: Dict[str, Any]) -> Dict[str, Any]:
+    duration = r.get("duration")
+    return {
+        "title": r.get("title") or "Unknown",
+        "duration_min": duration,
+        "duration_sec": int(time_to_seconds(duration)) if duration else 0,
+        "thumb": r.get("thumbnails", [{}])[0].get("url", "").split("?")[0],
+        "vidid": r.get("id"),
+        "link": r.get("link"),
+        "views": (r.get("viewCount") or {}).get("short"),
+        "channel": (r.get("channel") or {}).get("name"),
+    }
+
+def _meta_from_api(res: Dict[str, Any]) -> Dict[str, Any]:
+    duration_sec = int(res.get("duration", 0) or 0)
+    vid_url = res.get("url", "")
+    return {
+        "title": res.get("title", "Unknown"),
+        "duration_min": sec_to_min(duration_sec),
+        "duration_sec": duration_sec,
+        "thumb": res.get("thumbnail", ""),
+        "vidid": extract_video_id(vid_url),
+        "link": vid_url,
+        "views": None,
+        "channel": None,
+    }
+
+def _meta_remember(key: str, meta: Dict[str, Any]) -> None:
+    _meta_cache.set(key, meta)
+    if meta.get("vidid"):
+        _meta_cache.set(f"id:{meta['vidid']}", meta)
+
+async def _meta_l2_get(key: str) -> Optional[Dict[str, Any]]:
+    if not config.YT_META_MONGO_CACHE: return None
+    try:
+        doc = await mongodb.ytmeta.find_one({"_id": key})
+    except Exception:
+        return None
+    if not doc or doc.get("expires", 0) < time.time(): return None
+    return doc.get("meta")
 
-async def deduplicate_download(key: str, runner):
-    async with _inflight_lock:
-        if fut := _inflight.get(key):
-            LOGGER.info(f"🔗 Joining download: {key}")
-            return await fut
-        fut = asyncio.get_running_loop().create_future()
-        _inflight[key] = fut
+async def _meta_l2_set(key: str, meta: Dict[str, Any]) -> None:
+    global _meta_index_ready
+    if not config.YT_META_MONGO_CACHE: return
+    expires_at = datetime.utcnow() + timedelta(seconds=META_CACHE_TTL)
     try:
-        result = await runner()
-        if not fut.done(): fut.set_result(result)
-        return result
+        if not _meta_index_ready:
+            await mongodb.ytmeta.create_index("expires_at", expireAfterSeconds=0)
+            _meta_index_ready = True
+        keys = {key, f"id:{meta['vidid']}"} if meta.get("vidid") else {key}
+        for k in keys:
+            await mongodb.ytmeta.update_one(
+                {"_id": k},
+                {"$set": {"meta": meta, "expires": time.time() + META_CACHE_TTL, "expires_at": expires_at}},
+                upsert=True,
+            )
     except Exception as e:
-        if not fut.done(): fut.set_exception(e)
+        LOGGER.warning(f"⚠️ Metadata cache write failed: {e}")
+
+async def _meta_fetch(link: str, search_api) -> Optional[Dict[str, Any]]:
+    # 1. Local py_yt search
+    if VideosSearch:
+        try:
+            res = await VideosSearch(link, limit=1).next()
+            for r in (res or {}).get("result", []):
+                return _meta_from_search(r)
+        except Exception:
+            pass
+    # 2. Fallback API
+    res = await search_api(link)
+    if res: return _meta_from_api(res)
+    return None
+
+async def resolve_metadata(link: str, search_api) -> Optional[Dict[str, Any]]:
+    """One search per video/query: memory cache, then Mongo, then network."""
+    key = _meta_key(link)
+    meta = _meta_cache.get(key)
+    if meta: return meta
+
+    if fut := _meta_inflight.get(key):
+        return await asyncio.shield(fut)
+    fut = asyncio.get_running_loop().create_future()
+    _meta_inflight[key] = fut
+    meta = None
+    try:
+        meta = await _meta_l2_get(key)
+        if meta:
+            _meta_remember(key, meta)
+        else:
+            meta = await _meta_fetch(link, search_api)
+            if meta:
+                _meta_remember(key, meta)
+                # Written in the background: a slow Mongo must not delay /play (failures are logged).
+                asyncio.create_task(_meta_l2_set(key, meta))
+    except Exception:
+        meta = None
+    finally:
+        _meta_inflight.pop(key, None)
+        if not fut.done(): fut.set_result(meta)
+    return meta
+
+# === Search Slider Pages ===
+
+def _slider_key(query: str) -> str:
+    return " ".join(str(query).lower().split())
+
+async def _search_slider_page(query: str, search_api) -> List[Dict[str, Any]]:
+    if VideosSearch:
+        try:
+            res = await VideosSearch(query, limit=SLIDER_PAGE_SIZE).next()
+            page = [_meta_from_search(r) for r in (res.get("result") or []) if r.get("id")]
+            if page:
+                for meta in page: _meta_remember(f"id:{meta['vidid']}", meta)
+                return page
+        except Exception: pass
+    # The API fallback only knows the top result.
+    res = await search_api(query)
+    return [_meta_from_api(res)] if res else []
+
+async def slider_page(query: str, search_api) -> List[Dict[str, Any]]:
+    """The 10-result search page behind a slider, cached per normalized query."""
+    key = _slider_key(query)
+    page = _slider_pages.get(key)
+    if page is not None: return page
+    if fut := _slider_inflight.get(key):
+        return await asyncio.shield(fut)
+    fut = asyncio.get_running_loop().create_future()
+    _slider_inflight[key] = fut
+    page = []
+    try:
+        page = await _search_slider_page(query, search_api)
+        if page: _slider_pages.set(key, page)
+    except Exception:
+        page = []
+    finally:
+        _slider_inflight.pop(key, None)
+        if not fut.done(): fut.set_result(page)
+    return page
+
+def _prefetch_slider_thumbs(page: List[Dict[str, Any]], index: int) -> None:
+    """Fetches the thumbnails either side of `index` so the next click needs no network."""
+    for i in (index - 1, index + 1):
+        meta = page[i % len(page)]
+        vid = meta.get("vidid")
+        if not vid or not meta.get("thumb") or _slider_thumbs.get(vid) or vid in _slider_thumb_tasks: continue
+        _slider_thumb_tasks[vid] = asyncio.create_task(_fetch_slider_thumb(vid, meta["thumb"]))
+
+async def _fetch_slider_thumb(vid: str, url: str) -> None:
+    try:
+        session = await get_http_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            if resp.status == 200: _slider_thumbs.set(vid, await resp.read())
+    except Exception: pass
+    finally:
+        _slider_thumb_tasks.pop(vid, None)
+
+def _slider_media(vid: str, url: str):
+    """Best photo to send for a slider entry: Telegram file_id, prefetched bytes, or the URL."""
+    cached = _slider_thumbs.get(vid)
+    if isinstance(cached, str): return cached
+    if isinstance(cached, bytes):
+        photo = BytesIO(cached)
+        photo.name = f"{vid}.jpg"
+        return photo
+    return url
+
+# === Tier Health & Circuit Breakers ===
+
+class _TierSkip(Exception):
+    """Raised by a tier that does not apply to a request (e.g. not in the media DB)."""
+
+class _TierUnplayable(Exception):
+    """Raised by a tier when the video itself cannot be played; says nothing about the tier."""
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+class _TierHealth:
+    """Rolling success rate and latency of one download tier, plus its circuit breaker.
+
+    closed -> open after repeated failures; open -> half_open after a cooldown,
+    where a single probe request decides between closed and a longer open.
+    """
+
+    def __init__(self, name: str, rank: int):
+        self.name = name
+        self.rank = rank
+        self.samples: deque = deque(maxlen=TIER_WINDOW)
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.cooldown = TIER_COOLDOWN
+        self.consecutive_failures = 0
+        self.probing = False
+
+    def success_rate(self) -> Optional[float]:
+        if not self.samples: return None
+        return sum(1 for ok, _ in self.samples if ok) / len(self.samples)
+
+    def latency(self, q: float = 0.5) -> Optional[float]:
+        times = sorted(t for ok, t in self.samples if ok)
+        if not times: return None
+        return times[min(len(times) - 1, int(q * len(times)))]
+
+    def available(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state, self.probing = "half_open", False
+        return self.state == "closed" or (self.state == "half_open" and not self.probing)
+
+    def acquire(self) -> bool:
+        if not self.available(): return False
+        if self.state == "half_open": self.probing = True
+        return True
+
+    def release(self) -> None:
+        """Gives back a half-open probe slot that ended without a verdict."""
+        self.probing = False
+
+    def record(self, ok: bool, latency: float) -> None:
+        self.samples.append((ok, latency))
+        self.probing = False
+        if ok:
+            self.consecutive_failures = 0
+            if self.state != "closed": LOGGER.info(f"✅ Tier {self.name} recovered")
+            self.state, self.cooldown = "closed", TIER_COOLDOWN
+        else:
+            self.consecutive_failures += 1
+            rate = self.success_rate()
+            if self.state == "half_open":
+                self._open(min(self.cooldown * 2, TIER_MAX_COOLDOWN))
+            elif self.consecutive_failures >= TIER_CONSECUTIVE_FAILS or (
+                len(self.samples) >= TIER_MIN_SAMPLES and rate is not None and rate < TIER_MIN_SUCCESS_RATE
+            ):
+                self._open(TIER_COOLDOWN)
+        DOWNLOAD_STATS["tiers"][self.name] = self.snapshot()
+
+    def _open(self, cooldown: float) -> None:
+        self.state, self.opened_at, self.cooldown = "open", time.monotonic(), cooldown
+        LOGGER.warning(f"⛔ Tier {self.name} circuit open for {int(cooldown)}s")
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this tier before starting the next one alongside it."""
+        if len(self.samples) < TIER_MIN_SAMPLES or self.latency() is None:
+            return TIER_DEFAULT_COST[self.name] * 3
+        return max(TIER_HEDGE_MIN_DELAY, self.latency(config.TIER_HEDGE_PERCENTILE))
+
+    def expected_cost(self) -> float:
+        """Seconds a request is expected to spend here per success."""
+        latency, rate = self.latency(), self.success_rate()
+        if latency is None or rate is None or len(self.samples) < TIER_MIN_SAMPLES:
+            return TIER_DEFAULT_COST[self.name]
+        return latency / max(rate, 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        rate, latency = self.success_rate(), self.latency()
+        return {
+            "state": self.state,
+            "samples": len(self.samples),
+            "success_rate": round(rate, 2) if rate is not None else None,
+            "p50_latency": round(latency, 2) if latency is not None else None,
+            "cooldown": int(self.cooldown) if self.state != "closed" else 0,
+        }
+
+_tiers: Dict[str, _TierHealth] = {
+    name: _TierHealth(name, rank) for rank, name in enumerate(("media_db", "v2", "cookies"))
+}
+DOWNLOAD_STATS["tiers"] = {name: t.snapshot() for name, t in _tiers.items()}
+
+def _ordered_tiers(names: List[str]) -> Tuple[List[_TierHealth], List[_TierHealth]]:
+    """(available tiers best-first, tiers behind an open breaker in the default order)."""
+    healths = [_tiers[n] for n in names]
+    available = sorted((t for t in healths if t.available()), key=lambda t: (t.expected_cost(), t.rank))
+    return available, sorted((t for t in healths if t not in available), key=lambda t: t.rank)
+
+async def _record_when_filled(health: _TierHealth, gf: _GrowingFile, started: float) -> None:
+    await gf.done.wait()
+    health.record(gf.ok, time.monotonic() - started)
+
+async def _run_tiers(runners: Dict[str, Any], failure: Optional[Dict[str, Optional[str]]] = None):
+    """Runs tiers best-first until one returns a result. Returns (tier name, result).
+
+    A tier still busy past its usual latency percentile gets the next tier started
+    beside it (a hedge); the first result wins and the others are cancelled.
+    An unplayable reason reported by a tier is stored in `failure["reason"]`.
+    """
+    pending, blocked = _ordered_tiers(list(runners))
+    running: Dict[asyncio.Task, tuple] = {}
+    tried = False
+
+    def start_next(hedge: bool = False) -> None:
+        while pending:
+            health = pending.pop(0)
+            if health.state != "open" and not health.acquire(): continue
+            running[asyncio.create_task(runners[health.name]())] = (health, time.monotonic(), hedge)
+            return
+
+    try:
+        while True:
+            if not running:
+                start_next()
+                if not running and not tried and blocked:
+                    # Every available tier skipped this request: still try those
+                    # behind open breakers, in the default order, rather than fail outright.
+                    pending, blocked = blocked, []
+                    start_next()
+                if not running: return None, None
+            timeout = None
+            if pending:
+                health, started, _ = list(running.values())[-1]
+                timeout = max(0.0, started + health.hedge_delay() - time.monotonic())
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                LOGGER.info(f"🪁 Tier {health.name} is slow, hedging with the next tier")
+                _inc("hedges")
+                start_next(hedge=True)
+                continue
+            for task in done:
+                health, started, hedged = running.pop(task)
+                try:
+                    result = task.result()
+                except (_TierSkip, asyncio.CancelledError):
+                    health.release()
+                    continue
+                except _TierUnplayable as e:
+                    # The video is at fault, not the tier: no verdict on its health.
+                    LOGGER.warning(f"Tier {health.name}: video unplayable ({e.reason})")
+                    health.release()
+                    if failure is not None: failure["reason"] = e.reason
+                    tried = True
+                    continue
+                except Exception as e:
+                    LOGGER.error(f"Tier {health.name} failed: {e}")
+                    result = None
+                tried = True
+                gf = _growing_file(result) if isinstance(result, str) else None
+                if gf and not gf.done.is_set():
+                    # First playable bytes are not the tier's latency; the finished transfer is.
+                    asyncio.create_task(_record_when_filled(health, gf, started))
+                else:
+                    health.record(bool(result), time.monotonic() - started)
+                if result:
+                    if hedged: _inc("hedge_wins")
+                    return health.name, result
+    finally:
+        for task, (health, _, _) in running.items():
+            task.cancel()
+            health.release()
+        if running: await asyncio.gather(*running, return_exceptions=True)
+
+async def _tier_media_db(vid: str, is_video: bool) -> Optional[str]:
+    if not vid or not TG_APP or not MEDIA_CHANNEL_ID or time.time() < TG_FLOOD_COOLDOWN:
+        raise _TierSkip()
+    if await lookup_media(vid, is_video): return await _download_from_media_db(vid, is_video)
+    # Only the video is in the catalog: fetch it and take its audio track.
+    if is_video or not await lookup_media(vid, True): raise _TierSkip()
+    video_path = await _download_from_media_db(vid, True)
+    if not video_path: return None
+    media_cache.put(vid, "video", video_path)
+    return await _demux_audio(vid, video_path)
+
+# === Audio From Video ===
+
+async def _demux_audio(vid: str, video_path: str) -> Optional[str]:
+    """Copies the audio stream of a downloaded video into its own file (no re-encode)."""
+    gf = _growing_file(video_path)
+    if gf:
+        await gf.done.wait()
+        if not gf.ok: return None
+        video_path = gf.final_path
+    if not video_path or not os.path.isfile(video_path): return None
+    _ensure_dir(DOWNLOAD_DIR)
+    # AAC fits an m4a, Opus (webm/mkv sources) an ogg; try them in that order.
+    for ext, muxer in (("m4a", "ipod"), ("opus", "ogg")):
+        out = os.path.join(DOWNLOAD_DIR, f"{vid}.{ext}")
+        tmp = out + ".demux"
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-y", "-loglevel", "error", "-i", video_path,
+            "-map", "0:a:0", "-vn", "-c:a", "copy", "-f", muxer, tmp,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            rc = await asyncio.wait_for(proc.wait(), DEMUX_TIMEOUT)
+        except BaseException:
+            proc.kill()
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+        if rc == 0 and os.path.isfile(tmp) and os.path.getsize(tmp) > 0:
+            os.replace(tmp, out)
+            _inc("audio_derived")
+            LOGGER.info(f"🎞️ Audio taken from video: {vid}")
+            return out
+        if os.path.exists(tmp): os.remove(tmp)
+    return None
+
+async def _audio_from_video(vid: str, priority: int = NOW_PLAYING) -> Optional[str]:
+    """Audio for `vid` from a cached or in-flight video download, if there is one.
+
+    Must be called without holding a download slot: the video job may still
+    be queued for one, so it is bumped to `priority` while we wait.
+    """
+    video_path = media_cache.peek(vid, "video")
+    if not video_path:
+        job = download_jobs.get(f"video:{vid}")
+        if job is None: return None
+        download_scheduler.bump(job.key, priority)
+        # asyncio.wait never cancels the other request's job, even if we are cancelled.
+        await asyncio.wait({job.task})
+        if job.task.cancelled() or not job.task.result(): return None
+        video_path = job.task.result()
+    try:
+        return await _demux_audio(vid, video_path)
+    except asyncio.TimeoutError:
+        LOGGER.warning(f"⚠️ Audio demux timed out: {vid}")
         return None
+
+# === Resolved Stream URLs ===
+
+def _stream_url_expiry(url: str) -> Optional[float]:
+    """Unix time a signed stream URL stops working (query `expire=` or HLS `/expire/<ts>/`)."""
+    parsed = urlparse(url)
+    expire = parse_qs(parsed.query).get("expire")
+    if not expire:
+        m = STREAM_EXPIRE_PATH_RE.search(parsed.path)
+        expire = [m.group(1)] if m else None
+    try:
+        return float(expire[0]) if expire else None
+    except ValueError:
+        return None
+
+def _remember_stream_url(vid: str, fmt: str, url: str) -> None:
+    expiry = _stream_url_expiry(url)
+    ttl = expiry - time.time() - STREAM_URL_MARGIN if expiry else STREAM_URL_DEFAULT_TTL
+    if ttl > 0: _stream_urls.set((vid, fmt), url, ttl)
+
+async def _resolve_stream_url(link: str, vid: Optional[str], fmt: str = STREAM_URL_FORMAT) -> Optional[str]:
+    cookie_file = cookie_txt_file()
+    if not cookie_file: raise _TierSkip()
+    try:
+        url = await ytdlp_pool.resolve(
+            link, {"cookiefile": cookie_file, "format": fmt}, baseline=BASELINE_STREAM
+        )
+    except YtdlpPoolBusy:
+        # Our own backpressure, not the tier's health.
+        raise _TierSkip()
+    except YtdlpError as e:
+        cookie_pool.report(cookie_file, False, str(e))
+        raise
+    cookie_pool.report(cookie_file, bool(url), "" if url else "no stream url")
+    if url and vid: _remember_stream_url(vid, fmt, url)
+    return url
+
+async def _refresh_stream_url(link: str, vid: str, fmt: str) -> None:
+    try:
+        if await _resolve_stream_url(link, vid, fmt): _inc("stream_url_refresh")
+    except _TierSkip:
+        pass
+    except Exception as e:
+        LOGGER.warning(f"Stream URL refresh failed for {vid}: {e}")
     finally:
-        async with _inflight_lock:
-            if _inflight.get(key) == fut:
-                _inflight.pop(key, None)
+        _stream_url_refresh.pop((vid, fmt), None)
+
+def cached_stream_url(link: str, vid: Optional[str], fmt: str = STREAM_URL_FORMAT) -> Optional[str]:
+    """A still-valid resolved URL, refreshed in the background when it is about to expire."""
+    if not vid: return None
+    url = _stream_urls.get((vid, fmt))
+    if not url: return None
+    left = _stream_urls.expires_in((vid, fmt))
+    if left is not None and left < STREAM_URL_REFRESH - STREAM_URL_MARGIN and (vid, fmt) not in _stream_url_refresh:
+        _stream_url_refresh[(vid, fmt)] = asyncio.create_task(_refresh_stream_url(link, vid, fmt))
+    return url
+
+# === Unplayable IDs ===
+
+def _unplayable_reason(error: str) -> Optional[str]:
+    error = error.lower()
+    for reason, fragments in UNPLAYABLE_PATTERNS:
+        if any(f in error for f in fragments): return reason
+    return None
+
+def unplayable(vid: Optional[str], kind: str) -> Optional[str]:
+    """Failure reason while `vid` is refused for `kind`, else None."""
+    if not vid: return None
+    reason = _unplayable.get((vid, kind))
+    if reason: _inc("unplayable_hit")
+    return reason
+
+def _record_unplayable(vid: Optional[str], reason: Optional[str]) -> None:
+    """Remembers a failure caused by the video itself (a tier ran and yt-dlp said why).
+
+    Skipped tiers, open breakers and unexplained errors (API down, no cookies)
+    say nothing about the video, so they are not recorded and use no budget.
+    """
+    if not vid or not reason: return
+    now = time.time()
+    count, since = _unplayable_attempts.get(vid, (0, now))
+    count += 1
+    left = UNPLAYABLE_RETRY_WINDOW - (now - since)
+    _unplayable_attempts.set(vid, (count, since), max(1.0, left))
+    ttl = UNPLAYABLE_TTL[reason]
+    if count >= UNPLAYABLE_RETRY_BUDGET and left > ttl: reason, ttl = "retry_budget", left
+    # The video itself is the problem, so it covers both kinds.
+    for k in ("audio", "video"):
+        _unplayable.set((vid, k), reason, ttl)
+    LOGGER.warning(f"🚫 {vid} unplayable ({reason}, attempt {count}), refusing for {int(ttl)}s")
+
+def _clear_unplayable(vid: Optional[str]) -> None:
+    if not vid: return
+    _unplayable_attempts.pop(vid)
+    _unplayable.pop((vid, "audio"))
+    _unplayable.pop((vid, "video"))
+
+# === Download Jobs ===
+
+class _DownloadJob:
+    def __init__(self, key: str):
+        self.key = key
+        self.state = "queued"
+        self.created = time.monotonic()
+        self.started: Optional[float] = None
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None
+
+class DownloadJobs:
+    """Runs each download once, in the background, independent of who waits for it.
+
+    Waiters give up after their own timeout while the job keeps going until it
+    finishes or reaches its deadline, so a late result still lands in the cache
+    for the next request. A job nobody waits for any more is only dropped while
+    it is still queued for a download slot.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.jobs: Dict[str, _DownloadJob] = {}
+        self.counts = {"completed": 0, "failed": 0, "expired": 0, "dropped": 0, "unattended": 0}
+
+    def get(self, key: str) -> Optional[_DownloadJob]:
+        return self.jobs.get(key)
+
+    def running(self, key: str) -> None:
+        """Called by a job's runner once it holds a download slot."""
+        job = self.jobs.get(key)
+        if job and job.state == "queued":
+            job.state = "running"
+            job.started = time.monotonic()
+
+    async def _run(self, job: _DownloadJob, runner):
+        try:
+            result = await asyncio.wait_for(runner(), self.deadline)
+            self.counts["completed" if result else "failed"] += 1
+            # Finished after every waiter timed out: only the cache profits now.
+            if result and not job.waiters: self.counts["unattended"] += 1
+            return result
+        except asyncio.TimeoutError:
+            self.counts["expired"] += 1
+            LOGGER.warning(f"⌛ Download job expired: {job.key}")
+            return None
+        except asyncio.CancelledError:
+            self.counts["dropped"] += 1
+            raise
+        except Exception as e:
+            self.counts["failed"] += 1
+            LOGGER.error(f"❌ Download job {job.key} failed: {e}")
+            return None
+        finally:
+            if self.jobs.get(job.key) is job: self.jobs.pop(job.key)
+
+    async def run(self, key: str, runner, timeout: Optional[float] = None):
+        """Result of the job for `key`, starting it if needed; waits at most `timeout` seconds."""
+        job = self.jobs.get(key)
+        if job is None:
+            job = self.jobs[key] = _DownloadJob(key)
+            job.task = asyncio.create_task(self._run(job, runner))
+        else:
+            LOGGER.info(f"🔗 Joining download: {key}")
+        job.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.task), timeout)
+        finally:
+            job.waiters -= 1
+            if not job.waiters and job.state == "queued" and not job.task.done():
+                self.jobs.pop(key, None)
+                job.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        states = {"queued": 0, "running": 0}
+        for job in self.jobs.values(): states[job.state] += 1
+        return {
+            **states,
+            "waiters": sum(job.waiters for job in self.jobs.values()),
+            **self.counts,
+            "scheduler": download_scheduler.stats(),
+            "uploads_queued": _upload_queue.qsize(),
+            "ytdlp": ytdlp_pool.stats(),
+        }
+
+    def active(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {"key": job.key, "state": job.state, "age": round(now - job.created, 1), "waiters": job.waiters}
+            for job in sorted(self.jobs.values(), key=lambda j: j.created)
+        ]
+
+download_jobs = DownloadJobs(DOWNLOAD_JOB_DEADLINE)
 
 # === MAIN CLASS ===
 
@@ -395,6 +1636,14 @@ class YouTubeAPI:
             LOGGER.error(f"⚠️ Metadata API Error: {e}")
         return None
 
+    # --- PROGRESSIVE PLAYBACK ---
+    def ffmpeg_params(self, path: Optional[str]) -> str:
+        return progressive_ffmpeg_params(path)
+
+    async def wait_until_buffered(self, path: Optional[str], position: Optional[int] = None,
+                                  duration: Optional[int] = None) -> bool:
+        return await wait_until_buffered(path, position, duration)
+
     async def exists(self, link: str, videoid: Union[bool, str] = None):
         if videoid: link = self.base + link
         return bool(re.search(self.regex, link))
@@ -415,149 +1664,56 @@ class YouTubeAPI:
                         return entity.url
         return None
 
-    # --- METADATA (Includes API Fallback) ---
-    async def details(self, link: str, videoid: Union[bool, str] = None):
+    # --- METADATA (Cached, Includes API Fallback) ---
+    async def metadata(self, link: str, videoid: Union[bool, str] = None) -> Optional[Dict[str, Any]]:
         if videoid: link = self.base + link
         if "&" in link: link = link.split("&")[0]
-        
-        # 1. Try Local py_yt
-        if VideosSearch:
-            try:
-                results = VideosSearch(link, limit=1)
-                res = await results.next()
-                if res and "result" in res:
-                    for r in res["result"]:
-                        sec = int(time_to_seconds(r["duration"])) if r.get("duration") else 0
-                        thumb = r.get("thumbnails", [{}])[0].get("url", "").split("?")[0]
-                        return r["title"], r["duration"], sec, thumb, r["id"]
-            except Exception:
-                pass # Fallback
-            
-        # 2. Try Fallback API
-        res = await self._search_api(link)
-        if res:
-            title = res.get("title", "Unknown")
-            duration_sec = int(res.get("duration", 0))
-            duration_str = sec_to_min(duration_sec)
-            thumb = res.get("thumbnail", "")
-            vid_url = res.get("url", "")
-            vidid = extract_video_id(vid_url)
-            return title, duration_str, duration_sec, thumb, vidid
-            
-        return None
+        return await resolve_metadata(link, self._search_api)
+
+    async def details(self, link: str, videoid: Union[bool, str] = None):
+        meta = await self.metadata(link, videoid)
+        if not meta: return None
+        return meta["title"], meta["duration_min"], meta["duration_sec"], meta["thumb"], meta["vidid"]
 
     async def title(self, link: str, videoid: Union[bool, str] = None):
-        if videoid: link = self.base + link
-        
-        if VideosSearch:
-            try:
-                results = VideosSearch(link, limit=1)
-                res = await results.next()
-                for r in res.get("result", []): return r["title"]
-            except: pass
-        
-        # Fallback
-        res = await self._search_api(link)
-        if res: return res.get("title", "")
-        return ""
+        meta = await self.metadata(link, videoid)
+        return meta["title"] if meta else ""
 
     async def duration(self, link: str, videoid: Union[bool, str] = None):
-        if videoid: link = self.base + link
-        
-        if VideosSearch:
-            try:
-                results = VideosSearch(link, limit=1)
-                res = await results.next()
-                for r in res.get("result", []): return r["duration"]
-            except: pass
-        
-        # Fallback
-        res = await self._search_api(link)
-        if res: return sec_to_min(res.get("duration", 0))
-        return "00:00"
+        meta = await self.metadata(link, videoid)
+        return meta["duration_min"] if meta else "00:00"
 
     async def thumbnail(self, link: str, videoid: Union[bool, str] = None):
-        if videoid: link = self.base + link
-        
-        if VideosSearch:
-            try:
-                results = VideosSearch(link, limit=1)
-                res = await results.next()
-                for r in res.get("result", []): 
-                     return r.get("thumbnails", [{}])[0].get("url", "").split("?")[0]
-            except: pass
-        
-        # Fallback
-        res = await self._search_api(link)
-        if res: return res.get("thumbnail", "")
-        return ""
+        meta = await self.metadata(link, videoid)
+        return meta["thumb"] if meta else ""
 
     async def track(self, link: str, videoid: Union[bool, str] = None):
-        if videoid: link = self.base + link
-        if "&" in link: link = link.split("&")[0]
-        
-        # 1. Try Local
-        if VideosSearch:
-            try:
-                results = VideosSearch(link, limit=1)
-                res = await results.next()
-                if res and "result" in res:
-                    for r in res["result"]:
-                        thumb = r.get("thumbnails", [{}])[0].get("url", "").split("?")[0]
-                        return {
-                            "title": r.get("title"), "link": r.get("link"), "vidid": r.get("id"),
-                            "duration_min": r.get("duration"), "thumb": thumb,
-                        }, r.get("id")
-            except: pass
-        
-        # 2. Fallback
-        res = await self._search_api(link)
-        if res:
-            title = res.get("title", "Unknown")
-            vid_url = res.get("url", "")
-            vidid = extract_video_id(vid_url)
-            duration_sec = int(res.get("duration", 0))
-            duration_str = sec_to_min(duration_sec)
-            thumb = res.get("thumbnail", "")
-            
-            return {
-                "title": title, "link": vid_url, "vidid": vidid,
-                "duration_min": duration_str, "thumb": thumb,
-            }, vidid
-            
-        return None, None
+        meta = await self.metadata(link, videoid)
+        if not meta: return None, None
+        return {
+            "title": meta["title"], "link": meta["link"], "vidid": meta["vidid"],
+            "duration_min": meta["duration_min"], "thumb": meta["thumb"],
+        }, meta["vidid"]
 
     async def slider(self, link: str, query_type: int, videoid: Union[bool, str] = None):
         if videoid: link = self.base + link
-        
-        # 1. Try Local
-        if VideosSearch:
-            try:
-                a = VideosSearch(link, limit=10)
-                res = await a.next()
-                result = res.get("result")
-                if not result or query_type >= len(result): 
-                    if query_type == 0 and not result: raise Exception("Empty")
-                    return None
-                
-                r = result[query_type]
-                thumb = r.get("thumbnails", [{}])[0].get("url", "").split("?")[0]
-                return r["title"], r["duration"], thumb, r["id"]
-            except: pass
-        
-        # 2. Fallback (Only works for first result / index 0)
-        if query_type == 0:
-            res = await self._search_api(link)
-            if res:
-                title = res.get("title", "Unknown")
-                duration_sec = int(res.get("duration", 0))
-                duration_str = sec_to_min(duration_sec)
-                thumb = res.get("thumbnail", "")
-                vid_url = res.get("url", "")
-                vidid = extract_video_id(vid_url)
-                return title, duration_str, thumb, vidid
-        
-        return None
+        page = await slider_page(link, self._search_api)
+        if query_type >= len(page): return None
+        _prefetch_slider_thumbs(page, query_type)
+        meta = page[query_type]
+        return meta["title"], meta["duration_min"], _slider_media(meta["vidid"], meta["thumb"]), meta["vidid"]
+
+    def warm_slider(self, query: str) -> None:
+        """Loads a search's slider page (and first neighbours' thumbnails) before anyone clicks."""
+        async def _warm():
+            page = await slider_page(query, self._search_api)
+            if page: _prefetch_slider_thumbs(page, 0)
+        asyncio.create_task(_warm())
+
+    def slider_sent(self, vidid: str, message) -> None:
+        """Remembers the file_id Telegram assigned to a slider thumbnail for reuse."""
+        photo = getattr(message, "photo", None)
+        if vidid and photo: _slider_thumbs.set(vidid, photo.file_id)
 
     async def playlist(self, link, limit, user_id, videoid: Union[bool, str] = None):
         if videoid: link = self.listbase + link
@@ -582,59 +1738,91 @@ class YouTubeAPI:
         ytdl_opts = {"quiet": True, "cookiefile": cookie_file}
         out = []
         try:
-            with yt_dlp.YoutubeDL(ytdl_opts) as ydl:
-                r = ydl.extract_info(link, download=False)
-                for f in r.get("formats", []):
-                    if "dash" in str(f.get("format")).lower(): continue
-                    out.append({
-                        "format": f.get("format"), "filesize": f.get("filesize"),
-                        "format_id": f.get("format_id"), "ext": f.get("ext"),
-                        "format_note": f.get("format_note"), "yturl": link
-                    })
-        except: pass
+            r = await ytdlp_pool.extract(link, ytdl_opts)
+            for f in r.get("formats", []):
+                if "dash" in str(f.get("format")).lower(): continue
+                out.append({
+                    "format": f.get("format"), "filesize": f.get("filesize"),
+                    "format_id": f.get("format_id"), "ext": f.get("ext"),
+                    "format_note": f.get("format_note"), "yturl": link
+                })
+            cookie_pool.report(cookie_file, True)
+        except Exception as e:
+            cookie_pool.report(cookie_file, False, str(e))
         return out, link
 
     # === VIDEO METHOD (With 3-Layer Fallback) ===
-    async def video(self, link: str, videoid: Union[bool, str] = None):
+    async def video(
+        self,
+        link: str,
+        videoid: Union[bool, str] = None,
+        priority: int = NOW_PLAYING,
+        chat_id: Optional[int] = None,
+    ):
         if videoid: link = self.base + link
 
         LOGGER.info(f"📹 Video Req: {link}")
+        vid = extract_video_id(link)
+        # Same key as download(video=True), so both paths share one job per video.
+        key = f"video:{vid or link}"
+
+        # 0. Local cache
+        if vid:
+            cached = media_cache.get(vid, "video")
+            if cached:
+                _inc("cache_hit")
+                return 1, cached
+
+        # 0b. Stream URL resolved earlier (live streams, seeks and stream changes)
+        url = cached_stream_url(link, vid)
+        if url:
+            _inc("stream_url_hit")
+            return 1, url
+
+        reason = unplayable(vid, "video")
+        if reason: return 0, UNPLAYABLE_MESSAGES[reason]
+        failure: Dict[str, Optional[str]] = {}
+
+        async def media_db():
+            return await _tier_media_db(vid, True)
+
+        async def v2():
+            return await v2_download_process(link, video=True)
+
+        async def cookies():
+            try:
+                return await _resolve_stream_url(link, vid)
+            except YtdlpError as e:
+                reason = _unplayable_reason(str(e))
+                if reason: raise _TierUnplayable(reason) from e
+                raise
 
         async def _run():
-            vid = extract_video_id(link)
-            
-            # 1. DB
-            if vid:
-                db_path = await _download_from_media_db(vid, is_video=True)
-                if db_path: return 1, db_path
-            
-            # 2. V2 API
-            path = await v2_download_process(link, video=True)
-            if path: 
+            async with download_scheduler.slot(priority, chat_id, key):
+                download_jobs.running(key)
+                tier, path = await _run_tiers({"media_db": media_db, "v2": v2, "cookies": cookies}, failure)
+            if not path:
+                _record_unplayable(vid, failure.get("reason"))
+                return None
+            _clear_unplayable(vid)
+            if tier == "v2":
                 _inc("v2_success")
-                return 1, path
-            
-            # 3. Cookie Fallback
-            LOGGER.info("🍪 Fallback: Using yt-dlp cookies")
-            cookie_file = cookie_txt_file()
-            if not cookie_file: return 0, "No cookies/API failed"
-            
-            cmd = ["yt-dlp", "--cookies", cookie_file, "-g", "-f", "best[height<=?720]", "--", link]
-            try:
-                proc = await asyncio.create_subprocess_exec(
-                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await proc.communicate()
-                if stdout: 
-                    _inc("cookie_success")
-                    return 1, stdout.decode().split("\n")[0]
-            except Exception as e:
-                LOGGER.error(f"Fallback error: {e}")
+                _queue_media_upload(vid, True, path)
+            if tier == "cookies": _inc("cookie_success")
+            elif vid: media_cache.put(vid, "video", path)
+            return path
 
-            return 0, "Failed"
+        download_scheduler.bump(key, priority)
+        # The job outlives this wait (see download()); a late result still fills the cache.
+        try:
+            path = await download_jobs.run(key, _run, HARD_TIMEOUT)
+            if path: return 1, path
+        except asyncio.TimeoutError:
+            _inc("timeout_fail")
+            LOGGER.error(f"❌ Timed Out waiting for {key}; the download keeps running")
 
-        key = f"video:{link}"
-        return await deduplicate_download(key, _run)
+        reason = _unplayable.get((vid, "video")) if vid else None
+        return 0, UNPLAYABLE_MESSAGES[reason] if reason else "No cookies/API failed"
 
     # === DOWNLOAD METHOD (With 3-Layer Fallback) ===
     async def download(
@@ -647,71 +1835,118 @@ class YouTubeAPI:
         songvideo: Union[bool, str] = None,
         format_id: Union[bool, str] = None,
         title: Union[bool, str] = None,
+        progressive: Union[bool, str] = None,
+        priority: int = NOW_PLAYING,
+        chat_id: Optional[int] = None,
     ) -> str:
         _inc("total")
         if videoid: link = self.base + link
         
         is_vid = True if (video or songvideo) else False
+        kind = "video" if is_vid else "audio"
         vid = extract_video_id(link)
         dedup_id = vid or link
-        key = f"{'video' if is_vid else 'audio'}:{dedup_id}"
+        key = f"{kind}:{dedup_id}"
         
         LOGGER.info(f"📥 Download Req: {dedup_id} (Video={is_vid})")
 
+        # 0. Local cache (no network, no API)
+        if vid:
+            cached = media_cache.get(vid, kind)
+            if cached:
+                _inc("success")
+                _inc("cache_hit")
+                return cached, True
+
+        # Known-bad ids fail right away instead of running every tier again.
+        reason = unplayable(vid, kind)
+        if reason: raise UnplayableError(vid, reason)
+        failure: Dict[str, Optional[str]] = {}
+
         async def _download_logic():
-            # 1. DB Check
-            if vid:
-                db_path = await _download_from_media_db(vid, is_video=is_vid)
-                if db_path: 
+            # Audio can be cut from a cached (or in-flight) video of the same track.
+            if vid and not is_vid:
+                path = await _audio_from_video(vid, priority)
+                if path:
                     _inc("success")
-                    return db_path
+                    media_cache.put(vid, kind, path)
+                    return path
+            granted = await download_scheduler.acquire(priority, chat_id, key)
+            gf = None
+            try:
+                download_jobs.running(key)
+                path = await _fetch()
+                gf = _growing_file(path)
+            finally:
+                # A progressive transfer keeps the slot until its filler is done.
+                if gf and not gf.done.is_set():
+                    asyncio.create_task(_release_when_filled(gf, granted))
+                else:
+                    download_scheduler.release(granted)
+            # Growing .part files are registered by the progressive filler once complete.
+            if path and vid and not path.endswith(".part"):
+                media_cache.put(vid, kind, path)
+            return path
+
+        async def media_db():
+            return await _tier_media_db(vid, is_vid)
+
+        async def v2():
+            return await v2_download_process(
+                link, video=is_vid, progressive=bool(progressive and config.PROGRESSIVE_PLAYBACK)
+            )
 
-            # 2. V2 Process
-            path = await v2_download_process(link, video=is_vid)
-            if path:
-                _inc("success")
-                _inc("v2_success")
-                return path
-            
-            # 3. Cookie Fallback
+        async def cookies():
             LOGGER.info("🍪 Fallback: Downloading via yt-dlp cookies")
             cookie_file = cookie_txt_file()
-            if not cookie_file:
+            if not cookie_file: raise _TierSkip()
+
+            opts = {
+                "format": video_format() if is_vid else audio_format(),
+                # Kind in the name: Opus audio and a VP9+Opus video would both be <id>.webm.
+                "outtmpl": f"downloads/%(id)s.{kind}.%(ext)s", "quiet": True, 
+                "cookiefile": cookie_file, "no_warnings": True
+            }
+            try:
+                path = await ytdlp_pool.download(
+                    link, opts, timeout=HARD_TIMEOUT, baseline=BASELINE_VIDEO if is_vid else BASELINE_AUDIO
+                )
+            except YtdlpPoolBusy:
+                # Our own backpressure, not the tier's health.
+                raise _TierSkip()
+            except YtdlpError as e:
+                cookie_pool.report(cookie_file, False, str(e))
+                reason = _unplayable_reason(str(e))
+                if reason: raise _TierUnplayable(reason) from e
+                raise
+            ok = bool(path and os.path.exists(path))
+            cookie_pool.report(cookie_file, ok, "" if ok else "no output file")
+            return path if ok else None
+
+        async def _fetch():
+            tier, path = await _run_tiers({"media_db": media_db, "v2": v2, "cookies": cookies}, failure)
+            if not path:
                 _inc("failed")
+                _record_unplayable(vid, failure.get("reason"))
                 return None
-            
-            loop = asyncio.get_running_loop()
-            def _legacy_dl():
-                opts = {
-                    "format": "bestaudio/best" if not is_vid else "(bestvideo+bestaudio)",
-                    "outtmpl": "downloads/%(id)s.%(ext)s", "quiet": True, 
-                    "cookiefile": cookie_file, "no_warnings": True
-                }
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    info = ydl.extract_info(link, download=True)
-                    return os.path.join("downloads", f"{info['id']}.{info['ext']}")
+            _inc("success")
+            _clear_unplayable(vid)
+            if tier == "v2": _inc("v2_success")
+            if tier == "cookies": _inc("cookie_success")
+            if tier != "media_db": _queue_media_upload(vid, is_vid, path)
+            return path
 
-            try:
-                path = await loop.run_in_executor(None, _legacy_dl)
-                if path and os.path.exists(path):
-                    _inc("success")
-                    _inc("cookie_success")
-                    return path
-            except Exception as e:
-                LOGGER.error(f"Fallback failed: {e}")
+        # A queued prefetch of this track becomes urgent once someone waits on it.
+        download_scheduler.bump(key, priority)
 
-            _inc("failed")
-            return None
-
-        # Execute
+        # Execute (the job outlives this wait and still fills the cache)
         try:
-            path = await asyncio.wait_for(
-                deduplicate_download(key, _download_logic), 
-                timeout=HARD_TIMEOUT
-            )
+            path = await download_jobs.run(key, _download_logic, HARD_TIMEOUT)
             if path: return path, True
-        except Exception as e:
+        except asyncio.TimeoutError:
             _inc("timeout_fail")
-            LOGGER.error(f"❌ Timed Out: {e}")
+            LOGGER.error(f"❌ Timed Out waiting for {key}; the download keeps running")
 
+        reason = _unplayable.get((vid, kind)) if vid else None
+        if reason: raise UnplayableError(vid, reason)
         return None, None
@@ -252,6 +252,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     mystic,
                     videoid=True,
                     video=status,
+                    progressive=True,
+                    chat_id=chat_id,
                 )
             except:
                 return await mystic.edit_text(_["call_6"])
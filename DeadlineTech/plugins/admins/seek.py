@@ -57,6 +57,8 @@ async def seek_comm(cli, message: Message, _, chat_id):
         file_path = check
     if "index_" in file_path:
         file_path = playing[0]["vidid"]
+    if not await YouTube.wait_until_buffered(file_path, to_seek, duration_seconds):
+        return await mystic.edit_text(_["admin_26"], reply_markup=close_markup(_))
     try:
         await Anony.seek_stream(
             chat_id,
@@ -9,6 +9,7 @@ from DeadlineTech import app
 from DeadlineTech.misc import db
 from DeadlineTech.utils.decorators import AdminRightsCheck
 from DeadlineTech.utils.inline import close_markup
+from DeadlineTech.utils.stream.prefetch import prefetcher
 from config import BANNED_USERS
 
 
@@ -30,6 +31,7 @@ async def admins(Client, message: Message, _, chat_id):
         return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
     random.shuffle(check)
     check.insert(0, popped)
+    prefetcher.refresh(chat_id)
     await message.reply_text(
         _["admin_16"].format(message.from_user.mention), reply_markup=close_markup(_)
     )
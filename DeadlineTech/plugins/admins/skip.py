@@ -138,6 +138,8 @@ async def skip(cli, message: Message, _, chat_id):
                 mystic,
                 videoid=True,
                 video=status,
+                progressive=True,
+                chat_id=chat_id,
             )
         except:
             return await mystic.edit_text(_["call_6"])
@@ -1,13 +1,15 @@
 # Powered By Team DeadlineTech
 
+import asyncio
+
 from pyrogram.types import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     InlineQueryResultPhoto,
 )
-from youtubesearchpython.__future__ import VideosSearch
 
 from DeadlineTech import app
+from DeadlineTech.utils.inline_search import ANSWER_CACHE_TIME, INTERIM_CACHE_TIME, inline_search
 from DeadlineTech.utils.inlinequery import answer
 from config import BANNED_USERS
 
@@ -22,17 +24,22 @@ async def inline_query_handler(client, query):
         except:
             return
     else:
-        a = VideosSearch(text, limit=20)
-        result = (await a.next()).get("result")
-        for x in range(15):
-            title = (result[x]["title"]).title()
-            duration = result[x]["duration"]
-            views = result[x]["viewCount"]["short"]
-            thumbnail = result[x]["thumbnails"][0]["url"].split("?")[0]
-            channellink = result[x]["channel"]["link"]
-            channel = result[x]["channel"]["name"]
-            link = result[x]["link"]
-            published = result[x]["publishedTime"]
+        try:
+            results, final = await inline_search.search(query.from_user.id, text)
+        except asyncio.CancelledError:
+            # Superseded by a newer query from the same user; Telegram discards this one anyway.
+            return
+        except:
+            return
+        for result in results:
+            title = result["title"]
+            duration = result["duration"]
+            views = result["views"]
+            thumbnail = result["thumbnail"]
+            channellink = result["channellink"]
+            channel = result["channel"]
+            link = result["link"]
+            published = result["published"]
             description = f"{views} | {duration} ᴍɪɴᴜᴛᴇs | {channel}  | {published}"
             buttons = InlineKeyboardMarkup(
                 [
@@ -65,6 +72,10 @@ async def inline_query_handler(client, query):
                 )
             )
         try:
-            return await client.answer_inline_query(query.id, results=answers)
+            return await client.answer_inline_query(
+                query.id,
+                results=answers,
+                cache_time=ANSWER_CACHE_TIME if final else INTERIM_CACHE_TIME,
+            )
         except:
             return
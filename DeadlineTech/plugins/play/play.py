@@ -23,6 +23,7 @@ from DeadlineTech.utils.inline import (
     slider_markup,
     track_markup,
 )
+from DeadlineTech.utils.latency import mark, set_source
 from DeadlineTech.utils.logger import play_logs
 from DeadlineTech.utils.stream.stream import stream
 from config import BANNED_USERS, lyrical
@@ -87,8 +88,10 @@ async def play_commnd(
                 _["play_6"].format(config.DURATION_LIMIT_MIN, app.mention)
             )
         
+        set_source("telegram")
         file_path = await Telegram.get_filepath(audio=audio_telegram)
         if await Telegram.download(_, message, mystic, file_path):
+            mark("download")
             message_link = await Telegram.get_link(message)
             file_name = await Telegram.get_filename(audio_telegram, audio=True)
             dur = await Telegram.get_duration(audio_telegram, file_path)
@@ -133,8 +136,10 @@ async def play_commnd(
         if video_telegram.file_size > config.TG_VIDEO_FILESIZE_LIMIT:
             return await mystic.edit_text(_["play_8"])
             
+        set_source("telegram")
         file_path = await Telegram.get_filepath(video=video_telegram)
         if await Telegram.download(_, message, mystic, file_path):
+            mark("download")
             message_link = await Telegram.get_link(message)
             file_name = await Telegram.get_filename(video_telegram)
             dur = await Telegram.get_duration(video_telegram, file_path)
@@ -169,6 +174,7 @@ async def play_commnd(
     # ==========================
     elif url:
         if await YouTube.exists(url):
+            set_source("youtube")
             if "playlist" in url:
                 try:
                     details = await YouTube.playlist(
@@ -208,6 +214,7 @@ async def play_commnd(
                 )
         
         elif await Spotify.valid(url):
+            set_source("spotify")
             spotify = True
             if not config.SPOTIFY_CLIENT_ID and not config.SPOTIFY_CLIENT_SECRET:
                 return await mystic.edit_text(
@@ -256,6 +263,7 @@ async def play_commnd(
                 return await mystic.edit_text(_["play_15"])
         
         elif await Apple.valid(url):
+            set_source("apple")
             if "album" in url:
                 try:
                     details, track_id = await Apple.track(url)
@@ -282,6 +290,7 @@ async def play_commnd(
                 return await mystic.edit_text(_["play_3"])
         
         elif await Resso.valid(url):
+            set_source("resso")
             try:
                 details, track_id = await Resso.track(url)
             except:
@@ -295,6 +304,7 @@ async def play_commnd(
             cap = _["play_10"].format(details["title"], details["duration_min"])
         
         elif await SoundCloud.valid(url):
+            set_source("soundcloud")
             return await mystic.edit_text("❌ SoundCloud streaming and downloading is currently disabled.")
         
         else:
@@ -346,6 +356,7 @@ async def play_commnd(
                 reply_markup=InlineKeyboardMarkup(buttons),
             )
         
+        set_source("youtube")
         slider = True
         query = message.text.split(None, 1)[1]
         if "-v" in query:
@@ -364,6 +375,7 @@ async def play_commnd(
     # ==========================
     #  STREAMING LOGIC
     # ==========================
+    mark("resolve")
     if str(playmode) == "Direct":
         if not plist_type:
             if details["duration_min"]:
@@ -428,6 +440,8 @@ async def play_commnd(
             return await play_logs(message, streamtype=f"Playlist : {plist_type}")
         else:
             if slider:
+                # The slider buttons carry query[:20], so that is what later pages are searched by.
+                YouTube.warm_slider(query[:20])
                 buttons = slider_markup(
                     _,
                     track_id,
@@ -673,9 +687,11 @@ async def slider_queries(client, CallbackQuery, _):
                 duration_min,
             ),
         )
-        return await CallbackQuery.edit_message_media(
+        sent = await CallbackQuery.edit_message_media(
             media=med, reply_markup=InlineKeyboardMarkup(buttons)
         )
+        YouTube.slider_sent(vidid, sent)
+        return sent
     if what == "B":
         if rtype == 0:
             query_type = 9
@@ -694,6 +710,8 @@ async def slider_queries(client, CallbackQuery, _):
                 duration_min,
             ),
         )
-        return await CallbackQuery.edit_message_media(
+        sent = await CallbackQuery.edit_message_media(
             media=med, reply_markup=InlineKeyboardMarkup(buttons)
         )
+        YouTube.slider_sent(vidid, sent)
+        return sent
@@ -0,0 +1,58 @@
+# Powered By Team DeadlineTech
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from DeadlineTech import Apple, Resso, Spotify, YouTube, app
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.database import delete_catalog_match, save_catalog_match
+from DeadlineTech.utils.decorators.language import language
+
+
+async def _catalog_track(link: str):
+    for platform, api in (("spotify", Spotify), ("apple", Apple), ("resso", Resso)):
+        if await api.valid(link):
+            return platform, api.catalog_id(link)
+    return None, None
+
+
+@app.on_message(filters.command(["fixmatch"]) & SUDOERS)
+@language
+async def fix_match(client, message: Message, _):
+    if len(message.command) != 3:
+        return await message.reply_text(_["catalog_1"])
+    platform, track_id = await _catalog_track(message.command[1])
+    if not track_id:
+        return await message.reply_text(_["catalog_2"])
+    target = message.command[2]
+    details = await YouTube.metadata(target, not await YouTube.exists(target))
+    if not details:
+        return await message.reply_text(_["catalog_3"])
+    try:
+        await save_catalog_match(platform, track_id, details, manual=True)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Could not save catalog match {platform}:{track_id}: {e}")
+        return await message.reply_text(_["catalog_7"])
+    await message.reply_text(
+        _["catalog_4"].format(platform.title(), track_id, details["title"], details["vidid"])
+    )
+
+
+@app.on_message(filters.command(["unmatch"]) & SUDOERS)
+@language
+async def un_match(client, message: Message, _):
+    if len(message.command) != 2:
+        return await message.reply_text(_["catalog_1"])
+    platform, track_id = await _catalog_track(message.command[1])
+    if not track_id:
+        return await message.reply_text(_["catalog_2"])
+    try:
+        removed = await delete_catalog_match(platform, track_id)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Could not delete catalog match {platform}:{track_id}: {e}")
+        return await message.reply_text(_["catalog_7"])
+    if removed:
+        await message.reply_text(_["catalog_5"])
+    else:
+        await message.reply_text(_["catalog_6"])
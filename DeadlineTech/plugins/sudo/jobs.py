@@ -0,0 +1,46 @@
+# Powered By Team DeadlineTech
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from DeadlineTech import app
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.platforms.Youtube import download_jobs
+from DeadlineTech.utils.decorators.language import language
+
+MAX_LISTED = 15
+
+
+@app.on_message(filters.command(["jobs"]) & SUDOERS)
+@language
+async def download_job_report(client, message: Message, _):
+    stats = download_jobs.stats()
+    text = _["jobs_1"].format(
+        stats["queued"],
+        stats["running"],
+        stats["waiters"],
+        stats["completed"],
+        stats["failed"],
+        stats["expired"],
+        stats["dropped"],
+        stats["unattended"],
+    )
+    for name, row in stats["scheduler"].items():
+        text += f"<code>{name:<12}{row['active']:>3}{row['waiting']:>4}{row['avg_wait']:>7.2f}s</code>\n"
+    ytdlp = stats["ytdlp"]
+    text += _["jobs_2"].format(
+        ytdlp["workers"],
+        ytdlp["idle"],
+        ytdlp["pending"],
+        ytdlp["bytes_saved"] / 1048576,
+        ytdlp["bytes_selected"] / 1048576,
+        stats["uploads_queued"],
+    )
+    active = download_jobs.active()
+    if active:
+        text += _["jobs_3"]
+        for job in active[:MAX_LISTED]:
+            text += _["jobs_4"].format(job["key"], job["state"], job["age"], job["waiters"])
+        if len(active) > MAX_LISTED:
+            text += _["jobs_5"].format(len(active) - MAX_LISTED)
+    await message.reply_text(text)
@@ -0,0 +1,51 @@
+# Powered By Team DeadlineTech
+
+import json
+import os
+import time
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from DeadlineTech import app
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.decorators.language import language
+from DeadlineTech.utils.latency import latency_stats
+
+
+@app.on_message(filters.command(["latency"]) & SUDOERS)
+@language
+async def play_latency(client, message: Message, _):
+    action = message.command[1].lower() if len(message.command) > 1 else ""
+    if action == "reset":
+        latency_stats.reset()
+        return await message.reply_text(_["latency_1"])
+
+    report = latency_stats.report()
+    if action == "export":
+        path = f"cache/latency_{int(time.time())}.json"
+        with open(path, "w") as f:
+            json.dump(
+                {"generated_at": int(time.time()), "traces": latency_stats.traces, "sources": report},
+                f,
+                indent=2,
+            )
+        await message.reply_document(path, caption=_["latency_2"])
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return
+
+    if not report:
+        return await message.reply_text(_["latency_3"])
+    text = _["latency_4"].format(latency_stats.traces)
+    for source, stages in report.items():
+        text += f"\n<b>{source}</b>\n"
+        for stage, row in stages.items():
+            text += (
+                f"<code>{stage:<13}{row['p50']:>7.2f}{row['p95']:>7.2f}{row['p99']:>7.2f}"
+                f"  n={row['count']}</code>\n"
+            )
+    text += _["latency_5"]
+    await message.reply_text(text)
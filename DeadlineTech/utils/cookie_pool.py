@@ -0,0 +1,188 @@
+# Powered By Team DeadlineTech
+
+import csv
+import os
+import random
+import time
+from typing import Dict, Optional
+
+from DeadlineTech.logging import LOGGER
+
+SCAN_INTERVAL = 15
+FAILURES_BEFORE_COOLDOWN = 3
+FAILURE_COOLDOWN = 300
+RATE_LIMIT_COOLDOWN = 900
+SIGN_IN_COOLDOWN = 1800
+MAX_COOLDOWN = 6 * 3600
+
+# yt-dlp error fragments, lowercased. Sign-in / bot checks mean YouTube flagged
+# the account; the "neutral" ones are about the video, not the cookie.
+SIGN_IN_ERRORS = ("sign in to confirm", "confirm you're not a bot", "confirm you’re not a bot")
+RATE_LIMIT_ERRORS = ("http error 429", "too many requests")
+NEUTRAL_ERRORS = (
+    "video unavailable", "private video", "has been removed", "is not available",
+    "members-only", "age-restricted", "premieres in", "live event will begin",
+)
+
+
+def _is_valid_cookie_file(path: str) -> bool:
+    """True for a Netscape cookie file holding at least one YouTube/Google cookie."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("#HttpOnly_"):
+                    line = line[len("#HttpOnly_"):]
+                elif not line or line.startswith("#"):
+                    continue
+                fields = line.split("\t")
+                if len(fields) >= 7 and ("youtube.com" in fields[0] or "google.com" in fields[0]):
+                    return True
+    except OSError:
+        pass
+    return False
+
+
+class _Cookie:
+    def __init__(self, path: str, mtime: float, valid: bool):
+        self.path = path
+        self.mtime = mtime
+        self.valid = valid
+        self.successes = 0
+        self.failures = 0
+        self.sign_in = 0
+        self.rate_limited = 0
+        self.consecutive = 0
+        self.strikes = 0
+        self.cooldown_until = 0.0
+        self.last_error = ""
+
+    def weight(self) -> float:
+        # Smoothed success rate, squared so proven cookies get most of the load.
+        return ((self.successes + 1) / (self.successes + self.failures + 2)) ** 2
+
+    def cool_down(self, seconds: float):
+        self.strikes += 1
+        seconds = min(seconds * (2 ** (self.strikes - 1)), MAX_COOLDOWN)
+        self.cooldown_until = time.time() + seconds
+        LOGGER(__name__).warning(
+            f"Cookie {os.path.basename(self.path)} cooling down for {int(seconds)}s ({self.last_error[:80]})"
+        )
+
+
+class CookiePool:
+    """Tracks the health of every cookie file in the cookies folder.
+
+    Files are validated once and re-read only when they change. Cookies that
+    keep failing, get rate-limited or hit YouTube's bot check are put into an
+    escalating cooldown; the rest are picked weighted by their success rate.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.cookies: Dict[str, _Cookie] = {}
+        self._dir_mtime = None
+        self._last_scan = 0.0
+
+    def _scan(self, force: bool = False):
+        now = time.time()
+        if not force and now - self._last_scan < SCAN_INTERVAL:
+            return
+        self._last_scan = now
+        try:
+            dir_mtime = os.stat(self.root).st_mtime
+            names = [n for n in os.listdir(self.root) if n.endswith(".txt")]
+        except FileNotFoundError:
+            self.cookies.clear()
+            self._dir_mtime = None
+            return
+        changed = dir_mtime != self._dir_mtime
+        self._dir_mtime = dir_mtime
+        seen = set()
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            cookie = self.cookies.get(path)
+            if cookie and cookie.mtime == mtime:
+                continue
+            # New or replaced file: start with a clean record.
+            valid = _is_valid_cookie_file(path)
+            self.cookies[path] = _Cookie(path, mtime, valid)
+            changed = True
+            if not valid:
+                LOGGER(__name__).warning(f"Ignoring invalid cookie file {name}")
+        for path in set(self.cookies) - seen:
+            self.cookies.pop(path, None)
+            changed = True
+        if changed:
+            usable = sum(1 for c in self.cookies.values() if c.valid)
+            LOGGER(__name__).info(f"Cookie pool: {usable}/{len(self.cookies)} usable files")
+
+    def pick(self) -> Optional[str]:
+        """Returns a healthy cookie file, or None if none is usable right now."""
+        self._scan()
+        now = time.time()
+        ready = [c for c in self.cookies.values() if c.valid and c.cooldown_until <= now]
+        if not ready:
+            return None
+        return random.choices(ready, weights=[c.weight() for c in ready])[0].path
+
+    def report(self, path: Optional[str], ok: bool, error: str = ""):
+        """Records the outcome of a yt-dlp call made with `path`."""
+        cookie = self.cookies.get(path) if path else None
+        if not cookie:
+            return
+        if ok:
+            cookie.successes += 1
+            cookie.consecutive = 0
+            cookie.strikes = 0
+            return
+        text = str(error or "").lower()
+        if text and any(e in text for e in NEUTRAL_ERRORS):
+            return
+        cookie.failures += 1
+        cookie.consecutive += 1
+        cookie.last_error = str(error or "unknown error")
+        if any(e in text for e in SIGN_IN_ERRORS):
+            cookie.sign_in += 1
+            cookie.cool_down(SIGN_IN_COOLDOWN)
+        elif any(e in text for e in RATE_LIMIT_ERRORS):
+            cookie.rate_limited += 1
+            cookie.cool_down(RATE_LIMIT_COOLDOWN)
+        elif cookie.consecutive >= FAILURES_BEFORE_COOLDOWN:
+            cookie.consecutive = 0
+            cookie.cool_down(FAILURE_COOLDOWN)
+
+    def stats(self) -> dict:
+        self._scan()
+        now = time.time()
+        return {
+            "files": len(self.cookies),
+            "valid": sum(1 for c in self.cookies.values() if c.valid),
+            "cooling": sum(1 for c in self.cookies.values() if c.valid and c.cooldown_until > now),
+        }
+
+    def export_csv(self, path: str) -> str:
+        """Writes per-cookie health to `path` (used by the /cookies sudo command)."""
+        self._scan(force=True)
+        now = time.time()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["file", "valid", "successes", "failures", "sign_in", "rate_limited",
+                 "cooldown_left", "last_error"]
+            )
+            for cookie in sorted(self.cookies.values(), key=lambda c: c.path):
+                writer.writerow([
+                    os.path.basename(cookie.path), cookie.valid, cookie.successes,
+                    cookie.failures, cookie.sign_in, cookie.rate_limited,
+                    max(0, int(cookie.cooldown_until - now)), cookie.last_error[:200],
+                ])
+        return path
+
+
+cookie_pool = CookiePool(os.path.join(os.getcwd(), "cookies"))
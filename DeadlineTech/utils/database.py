@@ -1,10 +1,15 @@
 import random
 import asyncio
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Union
 
+from pymongo.errors import DuplicateKeyError
+
+import config
 from DeadlineTech import userbot
 from DeadlineTech.core.mongo import mongodb
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.ttlcache import TTLCache
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -26,6 +31,7 @@ skipdb = mongodb.skipmode
 sudoersdb = mongodb.sudoers
 usersdb = mongodb.tgusersdb
 statsdb = mongodb.bot_stats
+catalogdb = mongodb.catalogmatch
 
 # Shifting to memory [mongo sucks often]
 active = []
@@ -43,6 +49,10 @@ pause = {}
 playmode = {}
 playtype = {}
 skipmode = {}
+catalogmatch = TTLCache(4096)
+# Seconds a match is reused from memory, so /fixmatch and /unmatch on another node show up soon.
+CATALOG_LOCAL_TTL = 600
+catalog_index_ready = False
 
 
 async def get_assistant_number(chat_id: int) -> str:
@@ -732,3 +742,78 @@ async def get_bot_stats():
         "current_year": current_year,
         "last_year": last_year
     }
+
+
+async def _ensure_catalog_index():
+    global catalog_index_ready
+    if catalog_index_ready:
+        return
+    catalog_index_ready = True
+    try:
+        await catalogdb.create_index("expires_at", expireAfterSeconds=0)
+    except Exception:
+        pass
+
+
+async def get_catalog_match(platform: str, track_id: str) -> Union[dict, None]:
+    """YouTube track details stored for a Spotify/Apple/Resso track, if any."""
+    key = f"{platform}:{track_id}"
+    details = catalogmatch.get(key)
+    if details:
+        return details
+    try:
+        match = await catalogdb.find_one({"_id": key})
+    except Exception as e:
+        # Without the database the track is simply matched live again.
+        LOGGER(__name__).warning(f"Catalog match lookup failed for {key}: {e}")
+        return None
+    if not match:
+        return None
+    left = CATALOG_LOCAL_TTL
+    expires_at = match.get("expires_at")
+    if expires_at:
+        left = min(left, (expires_at - datetime.utcnow()).total_seconds())
+        if left <= 0:
+            return None
+    catalogmatch.set(key, match["details"], ttl=left)
+    return match["details"]
+
+
+async def save_catalog_match(platform: str, track_id: str, details: dict, manual: bool = False):
+    """Remembers which YouTube video a catalog track resolved to.
+
+    Automatic matches expire after CATALOG_MATCH_TTL_DAYS; manual fixes never
+    expire and are not overwritten by automatic ones.
+    """
+    key = f"{platform}:{track_id}"
+    details = {k: details[k] for k in ("title", "link", "vidid", "duration_min", "thumb")}
+    if manual:
+        await catalogdb.update_one(
+            {"_id": key},
+            {"$set": {"details": details, "manual": True}, "$unset": {"expires_at": ""}},
+            upsert=True,
+        )
+        catalogmatch.set(key, details, ttl=CATALOG_LOCAL_TTL)
+        return
+    ttl = config.CATALOG_MATCH_TTL_DAYS * 86400
+    try:
+        await _ensure_catalog_index()
+        await catalogdb.update_one(
+            {"_id": key, "manual": {"$ne": True}},
+            {"$set": {"details": details, "expires_at": datetime.utcnow() + timedelta(seconds=ttl)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # A manual fix exists for this track; keep it.
+        return
+    except Exception as e:
+        LOGGER(__name__).warning(f"Catalog match save failed for {key}: {e}")
+        return
+    catalogmatch.set(key, details, ttl=CATALOG_LOCAL_TTL)
+
+
+async def delete_catalog_match(platform: str, track_id: str) -> bool:
+    key = f"{platform}:{track_id}"
+    catalogmatch.pop(key)
+    deleted = await catalogdb.delete_one({"_id": key})
+    return deleted.deleted_count > 0
@@ -31,6 +31,7 @@ from DeadlineTech.utils.database import (
     is_maintenance,
 )
 from DeadlineTech.utils.inline import botplaylist_markup
+from DeadlineTech.utils.latency import finish_trace, mark, start_trace
 from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
 from strings import get_string
 
@@ -44,6 +45,7 @@ links = {}
 
 def PlayWrapper(command):
     async def wrapper(client, message):
+        start_trace()
         try:
             language = await get_lang(message.chat.id)
             _ = get_string(language)
@@ -188,6 +190,7 @@ def PlayWrapper(command):
                 f"▶️ A Song is played by {message.from_user.id} in {chat_id}"
             )
 
+            mark("checks")
             return await command(
                 client,
                 message,
@@ -209,5 +212,7 @@ def PlayWrapper(command):
                 )
             except:
                 pass
+        finally:
+            finish_trace()
 
     return wrapper
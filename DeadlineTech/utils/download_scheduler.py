@@ -0,0 +1,165 @@
+# Powered By Team DeadlineTech
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, Optional
+from urllib.parse import urlparse
+
+import config
+
+# Priority classes, most urgent first.
+NOW_PLAYING = 0
+NEXT_UP = 1
+PLAYLIST = 2
+BACKGROUND = 3
+PRIORITY_NAMES = {NOW_PLAYING: "now_playing", NEXT_UP: "next_up", PLAYLIST: "playlist", BACKGROUND: "background"}
+
+
+class _Ticket:
+    def __init__(self, priority: int, chat_id: Hashable, key: Optional[str]):
+        self.priority = priority
+        self.chat_id = chat_id
+        self.key = key
+        self.granted = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+
+
+class DownloadScheduler:
+    """Admits downloads by priority class, round-robin between chats within a class.
+
+    Less urgent classes may only fill part of the slots, so a track a chat is
+    waiting on never queues behind a bulk of playlist or background downloads.
+    Also provides per-host connection caps and an optional global bandwidth limit
+    for the HTTP transfers themselves.
+    """
+
+    def __init__(self, max_active: int, per_host: int, bandwidth_kbps: int):
+        self.max_active = max(1, max_active)
+        # A class is only admitted while fewer than this many downloads run in total,
+        # which keeps the remaining slots free for more urgent classes.
+        self.class_limit = {
+            NOW_PLAYING: self.max_active,
+            NEXT_UP: max(1, self.max_active - 1),
+            PLAYLIST: max(1, self.max_active // 2),
+            BACKGROUND: max(1, self.max_active // 3),
+        }
+        self.per_host = max(1, per_host)
+        self.rate = bandwidth_kbps * 1024 if bandwidth_kbps > 0 else 0
+        self.active: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self.waiting: Dict[int, "OrderedDict[Hashable, deque]"] = {p: OrderedDict() for p in PRIORITY_NAMES}
+        self.admitted = {p: 0 for p in PRIORITY_NAMES}
+        self.wait_time = {p: 0.0 for p in PRIORITY_NAMES}
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._tokens = float(self.rate)
+        self._refilled = time.monotonic()
+        self._bucket_lock: Optional[asyncio.Lock] = None
+
+    def _running(self) -> int:
+        return sum(self.active.values())
+
+    def _eligible(self, priority: int) -> bool:
+        return self._running() < self.class_limit[priority]
+
+    def _dispatch(self):
+        for priority in sorted(self.waiting):
+            chats = self.waiting[priority]
+            while chats and self._eligible(priority):
+                chat_id, tickets = next(iter(chats.items()))
+                ticket = tickets.popleft()
+                if tickets:
+                    chats.move_to_end(chat_id)
+                else:
+                    chats.pop(chat_id)
+                if ticket.granted.done():
+                    continue
+                self.active[priority] += 1
+                self.admitted[priority] += 1
+                self.wait_time[priority] += time.monotonic() - ticket.queued_at
+                ticket.granted.set_result(priority)
+
+    def _enqueue(self, ticket: _Ticket):
+        self.waiting[ticket.priority].setdefault(ticket.chat_id, deque()).append(ticket)
+
+    def bump(self, key: str, priority: int):
+        """Moves a queued download to a more urgent class (e.g. a prefetch that is now playing)."""
+        for p in sorted(self.waiting, reverse=True):
+            if p <= priority:
+                break
+            for chat_id, tickets in list(self.waiting[p].items()):
+                for ticket in list(tickets):
+                    if ticket.key != key:
+                        continue
+                    tickets.remove(ticket)
+                    if not tickets:
+                        self.waiting[p].pop(chat_id)
+                    ticket.priority = priority
+                    self._enqueue(ticket)
+        self._dispatch()
+
+    async def acquire(self, priority: int = NOW_PLAYING, chat_id: Hashable = None, key: Optional[str] = None) -> int:
+        """Waits for a download slot; returns the class it was granted in, to pass to `release`."""
+        ticket = _Ticket(priority, chat_id, key)
+        self._enqueue(ticket)
+        self._dispatch()
+        try:
+            return await ticket.granted
+        except asyncio.CancelledError:
+            if ticket.granted.done() and not ticket.granted.cancelled():
+                self.release(ticket.granted.result())
+            else:
+                ticket.granted.cancel()
+            raise
+
+    def release(self, granted: int):
+        self.active[granted] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = NOW_PLAYING, chat_id: Hashable = None, key: Optional[str] = None):
+        granted = await self.acquire(priority, chat_id, key)
+        try:
+            yield
+        finally:
+            self.release(granted)
+
+    @asynccontextmanager
+    async def host_slot(self, url: str):
+        host = urlparse(url).hostname or ""
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        async with sem:
+            yield
+
+    async def throttle(self, nbytes: int):
+        """Waits until `nbytes` fit the global bandwidth limit (no-op when unlimited)."""
+        if not self.rate:
+            return
+        if self._bucket_lock is None:
+            self._bucket_lock = asyncio.Lock()
+        async with self._bucket_lock:
+            now = time.monotonic()
+            # At most one second of burst.
+            self._tokens = min(self.rate, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            self._tokens -= nbytes
+            if self._tokens < 0:
+                await asyncio.sleep(-self._tokens / self.rate)
+
+    def stats(self) -> dict:
+        return {
+            PRIORITY_NAMES[p]: {
+                "active": self.active[p],
+                "waiting": sum(len(t) for t in self.waiting[p].values()),
+                "admitted": self.admitted[p],
+                "avg_wait": round(self.wait_time[p] / self.admitted[p], 2) if self.admitted[p] else 0,
+            }
+            for p in PRIORITY_NAMES
+        }
+
+
+download_scheduler = DownloadScheduler(
+    config.DOWNLOAD_CONCURRENCY, config.DOWNLOAD_PER_HOST, config.DOWNLOAD_BANDWIDTH_KBPS
+)
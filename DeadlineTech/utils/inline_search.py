@@ -0,0 +1,136 @@
+# Powered By Team DeadlineTech
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from youtubesearchpython.__future__ import VideosSearch
+
+from DeadlineTech.utils.ttlcache import TTLCache
+
+SEARCH_LIMIT = 20
+RESULTS = 15
+CACHE_SIZE = 1024
+CACHE_TTL = 600
+# How long Telegram may reuse an answer: full results / interim prefix results.
+ANSWER_CACHE_TIME = 300
+INTERIM_CACHE_TIME = 5
+# Quiet period after a keystroke before a search is started for it.
+DEBOUNCE = 0.4
+MIN_PREFIX = 3
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _trim(r: dict) -> dict:
+    return {
+        "title": (r.get("title") or "").title(),
+        "duration": r.get("duration"),
+        "views": (r.get("viewCount") or {}).get("short"),
+        "thumbnail": ((r.get("thumbnails") or [{}])[0].get("url") or "").split("?")[0],
+        "channel": (r.get("channel") or {}).get("name"),
+        "channellink": (r.get("channel") or {}).get("link"),
+        "link": r.get("link"),
+        "published": r.get("publishedTime"),
+    }
+
+
+class InlineSearch:
+    """YouTube search for inline mode: cached, debounced and cancellable per user.
+
+    Each user has at most one pending search; a newer keystroke cancels the
+    older one before it reaches the network. Identical queries from different
+    users share one search.
+    """
+
+    def __init__(self):
+        self.cache = TTLCache(CACHE_SIZE, CACHE_TTL)
+        self.pending: Dict[int, asyncio.Task] = {}
+        self.searches: Dict[str, asyncio.Task] = {}
+        self.waiters: Dict[str, int] = {}
+        self.hits = 0
+        self.prefix_hits = 0
+        self.searched = 0
+        self.cancelled = 0
+
+    def prefix_results(self, key: str) -> Optional[List[dict]]:
+        """Results of the longest cached query that `key` extends, narrowed to the new words."""
+        for end in range(len(key) - 1, MIN_PREFIX - 1, -1):
+            cached = self.cache.get(key[:end])
+            if not cached:
+                continue
+            tail = key.split()[-1]
+            narrowed = [r for r in cached if tail in r["title"].lower()]
+            return narrowed or cached
+        return None
+
+    async def _search(self, key: str) -> List[dict]:
+        try:
+            self.searched += 1
+            result = (await VideosSearch(key, limit=SEARCH_LIMIT).next()).get("result") or []
+            results = [_trim(r) for r in result if r.get("link")][:RESULTS]
+            if results:
+                self.cache.set(key, results)
+            return results
+        finally:
+            self.searches.pop(key, None)
+
+    async def _debounced(self, key: str) -> List[dict]:
+        await asyncio.sleep(DEBOUNCE)
+        task = self.searches.get(key)
+        if task is None:
+            task = self.searches[key] = asyncio.create_task(self._search(key))
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                self.waiters.pop(key, None)
+                # Nobody wants this query any more: drop the network search too.
+                if not task.done():
+                    task.cancel()
+                    self.cancelled += 1
+
+    def _supersede(self, user_id: int, key: str) -> asyncio.Task:
+        old = self.pending.pop(user_id, None)
+        if old and not old.done():
+            old.cancel()
+        task = asyncio.create_task(self._debounced(key))
+        self.pending[user_id] = task
+        task.add_done_callback(
+            lambda t: self.pending.pop(user_id, None) if self.pending.get(user_id) is t else None
+        )
+        return task
+
+    async def search(self, user_id: int, text: str) -> Tuple[List[dict], bool]:
+        """Returns (results, final). `final` is False for interim prefix results.
+
+        Raises asyncio.CancelledError when a newer query from the same user
+        replaced this one.
+        """
+        key = normalize(text)
+        cached = self.cache.get(key)
+        if cached:
+            self.hits += 1
+            return cached, True
+        task = self._supersede(user_id, key)
+        interim = self.prefix_results(key)
+        if interim:
+            # Answer now; the real search keeps running so the next keystroke finds it cached.
+            self.prefix_hits += 1
+            return interim, False
+        return await task, True
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self.cache),
+            "hits": self.hits,
+            "prefix_hits": self.prefix_hits,
+            "searched": self.searched,
+            "cancelled": self.cancelled,
+        }
+
+
+inline_search = InlineSearch()
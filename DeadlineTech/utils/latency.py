@@ -0,0 +1,114 @@
+# Powered By Team DeadlineTech
+
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from DeadlineTech.logging import LOGGER
+
+WINDOW = 500
+# Display order of the /play stages; unknown stages are listed after these.
+STAGES = ("checks", "resolve", "download", "join_call", "thumbnail", "card", "total")
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("play_trace", default=None)
+
+
+class Trace:
+    """Timings of one /play request, split into consecutive stages."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self.source: Optional[str] = None
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.stages: List[Tuple[str, float]] = []
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+
+class LatencyStats:
+    """Rolling per-source, per-stage latency samples with percentile reports."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.samples: Dict[Tuple[str, str], deque] = {}
+        self.traces = 0
+
+    def record(self, trace: Trace):
+        self.traces += 1
+        totals: Dict[str, float] = {}
+        for stage, seconds in trace.stages:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        totals["total"] = trace.last - trace.started
+        for stage, seconds in totals.items():
+            key = (trace.source, stage)
+            if key not in self.samples:
+                self.samples[key] = deque(maxlen=self.window)
+            self.samples[key].append(seconds)
+
+    @staticmethod
+    def _pct(values: List[float], q: float) -> float:
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def report(self) -> Dict[str, Dict[str, dict]]:
+        """{source: {stage: {count, p50, p95, p99}}} in seconds."""
+        out: Dict[str, Dict[str, dict]] = {}
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        for (source, stage) in sorted(self.samples, key=lambda k: (k[0], order.get(k[1], len(order)), k[1])):
+            values = sorted(self.samples[(source, stage)])
+            out.setdefault(source, {})[stage] = {
+                "count": len(values),
+                "p50": round(self._pct(values, 0.50), 3),
+                "p95": round(self._pct(values, 0.95), 3),
+                "p99": round(self._pct(values, 0.99), 3),
+            }
+        return out
+
+    def reset(self):
+        self.samples.clear()
+        self.traces = 0
+
+
+latency_stats = LatencyStats(WINDOW)
+
+
+def start_trace() -> Trace:
+    trace = Trace()
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def set_source(source: str):
+    trace = _current.get()
+    if trace:
+        trace.source = source
+
+
+def mark(stage: str):
+    """Ends `stage` of the current request's trace (no-op outside a traced request)."""
+    trace = _current.get()
+    if trace:
+        trace.mark(stage)
+
+
+def finish_trace():
+    """Records the current trace if it got as far as choosing a source, then clears it."""
+    trace = _current.get()
+    _current.set(None)
+    if not trace or not trace.source:
+        return
+    trace.last = time.perf_counter()
+    latency_stats.record(trace)
+    breakdown = " ".join(f"{stage}={seconds:.2f}s" for stage, seconds in trace.stages)
+    LOGGER(__name__).info(
+        f"[trace {trace.id}] {trace.source} {breakdown} total={trace.last - trace.started:.2f}s"
+    )
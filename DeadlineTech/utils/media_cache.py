@@ -0,0 +1,241 @@
+# Powered By Team DeadlineTech
+
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+
+import config
+from DeadlineTech.core.dir import DOWNLOAD_DIR
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.misc import db
+
+INDEX_FILE = ".cache_index.json"
+SAVE_INTERVAL = 5
+# Seconds a newly added file is protected from eviction, so it survives until it is played.
+NEW_ENTRY_GRACE = 600
+
+# Extensions the download tiers write for each kind. "webm" is shared by both
+# kinds, so untracked webm files found on boot are only adopted when their name
+# carries the kind (yt-dlp writes "<id>.<kind>.<ext>").
+AUDIO_EXTS = ("mp3", "m4a", "opus", "ogg")
+VIDEO_EXTS = ("mp4", "mkv")
+
+CACHED_NAME_RE = re.compile(r"^([a-zA-Z0-9_-]{11})(?:\.(audio|video))?\.([a-z0-9]+)$")
+
+
+class MediaCache:
+    """Keeps finished YouTube downloads on disk within a byte budget.
+
+    Entries are keyed by video id and kind ("audio"/"video"). Files referenced by
+    any chat queue are pinned and never evicted, and new files are protected for
+    NEW_ENTRY_GRACE seconds (an LFU order would otherwise evict them first).
+    """
+
+    def __init__(self, root: str, budget: int, policy: str = "lru"):
+        self.root = root
+        self.budget = budget
+        self.policy = policy if policy in ("lru", "lfu") else "lru"
+        self.entries: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._loaded = False
+        self._dirty = False
+        self._last_save = 0.0
+
+    @staticmethod
+    def _key(vid: str, kind: str) -> str:
+        return f"{kind}:{vid}"
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.root, INDEX_FILE)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.index_path, "r") as f:
+                stored = json.load(f)
+        except Exception:
+            stored = {}
+        for key, entry in stored.items():
+            path = entry.get("path")
+            if path and os.path.isfile(path):
+                entry["size"] = os.path.getsize(path)
+                self.entries[key] = entry
+        self._adopt_untracked()
+        self._dirty = True
+        self.trim()
+        LOGGER(__name__).info(
+            f"Media cache loaded: {len(self.entries)} files, {self.total_size() // (1024 * 1024)} MB"
+        )
+
+    def _adopt_untracked(self):
+        tracked = {entry["path"] for entry in self.entries.values()}
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            match = CACHED_NAME_RE.match(name)
+            if not match:
+                continue
+            vid, tagged, ext = match.groups()
+            if tagged:
+                kind = tagged
+            elif ext in AUDIO_EXTS:
+                kind = "audio"
+            elif ext in VIDEO_EXTS:
+                kind = "video"
+            else:
+                continue
+            path = os.path.abspath(os.path.join(self.root, name))
+            key = self._key(vid, kind)
+            if path in tracked or key in self.entries:
+                continue
+            stat = os.stat(path)
+            self.entries[key] = {
+                "path": path,
+                "size": stat.st_size,
+                "atime": stat.st_mtime,
+                "hits": 0,
+            }
+
+    def _save(self, force: bool = False):
+        if not self._dirty:
+            return
+        now = time.time()
+        if not force and now - self._last_save < SAVE_INTERVAL:
+            return
+        tmp = self.index_path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.index_path)
+            self._dirty = False
+            self._last_save = now
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not save media cache index: {e}")
+
+    def total_size(self) -> int:
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def get(self, vid: str, kind: str) -> Optional[str]:
+        self._ensure_loaded()
+        key = self._key(vid, kind)
+        entry = self.entries.get(key)
+        if not entry:
+            self.misses += 1
+            return None
+        path = entry["path"]
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            self.entries.pop(key, None)
+            self._dirty = True
+            self.misses += 1
+            return None
+        entry["atime"] = time.time()
+        entry["hits"] = entry.get("hits", 0) + 1
+        self.hits += 1
+        self._dirty = True
+        self._save()
+        return path
+
+    def peek(self, vid: str, kind: str) -> Optional[str]:
+        """Like get(), but without touching recency or hit counters."""
+        self._ensure_loaded()
+        entry = self.entries.get(self._key(vid, kind))
+        if entry and os.path.isfile(entry["path"]):
+            return entry["path"]
+        return None
+
+    def put(self, vid: str, kind: str, path: str):
+        self._ensure_loaded()
+        if not vid or not path or not os.path.isfile(path):
+            return
+        path = os.path.abspath(path)
+        if os.path.dirname(path) != os.path.abspath(self.root):
+            return
+        key = self._key(vid, kind)
+        old = self.entries.get(key)
+        self.entries[key] = {
+            "path": path,
+            "size": os.path.getsize(path),
+            "atime": time.time(),
+            "hits": old.get("hits", 0) if old else 0,
+            "added": time.time(),
+        }
+        self._dirty = True
+        self.trim(keep=key)
+        self._save(force=True)
+
+    def owns(self, path: str) -> bool:
+        self._ensure_loaded()
+        if not path:
+            return False
+        path = os.path.abspath(path)
+        return any(entry["path"] == path for entry in self.entries.values())
+
+    def _pinned(self) -> set:
+        pinned = set()
+        for queue in list(db.values()):
+            for item in list(queue or []):
+                vid = item.get("vidid")
+                if not vid:
+                    continue
+                kind = "video" if str(item.get("streamtype")) == "video" else "audio"
+                pinned.add(self._key(vid, kind))
+                pinned.add(os.path.abspath(str(item.get("file"))))
+        return pinned
+
+    def trim(self, keep: Optional[str] = None):
+        self._ensure_loaded()
+        total = self.total_size()
+        if total <= self.budget:
+            return
+        pinned = self._pinned()
+        if keep:
+            pinned.add(keep)
+        fresh = time.time() - NEW_ENTRY_GRACE
+        if self.policy == "lfu":
+            order = lambda kv: (kv[1].get("hits", 0), kv[1]["atime"])
+        else:
+            order = lambda kv: kv[1]["atime"]
+        for key, entry in sorted(self.entries.items(), key=order):
+            if total <= self.budget:
+                break
+            if key in pinned or entry["path"] in pinned or entry.get("added", 0) > fresh:
+                continue
+            try:
+                os.remove(entry["path"])
+            except FileNotFoundError:
+                pass
+            except Exception:
+                continue
+            total -= entry["size"]
+            self.entries.pop(key, None)
+            self.evictions += 1
+            self._dirty = True
+        self._save(force=True)
+
+    def stats(self) -> dict:
+        self._ensure_loaded()
+        return {
+            "files": len(self.entries),
+            "bytes": self.total_size(),
+            "budget": self.budget,
+            "policy": self.policy,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+media_cache = MediaCache(
+    DOWNLOAD_DIR,
+    config.MEDIA_CACHE_SIZE_MB * 1024 * 1024,
+    config.MEDIA_CACHE_POLICY,
+)
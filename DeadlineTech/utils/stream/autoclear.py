@@ -1,6 +1,7 @@
 import os
 
 from config import autoclean
+from DeadlineTech.utils.media_cache import media_cache
 
 
 async def auto_clean(popped):
@@ -9,10 +10,15 @@ async def auto_clean(popped):
         autoclean.remove(rem)
         count = autoclean.count(rem)
         if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
+            if media_cache.owns(rem):
+                # Cached downloads stay on disk for replays; the cache
+                # evicts them once they are unpinned and over budget.
+                pass
+            elif "vid_" not in rem or "live_" not in rem or "index_" not in rem:
                 try:
                     os.remove(rem)
                 except:
                     pass
     except:
         pass
+    media_cache.trim()
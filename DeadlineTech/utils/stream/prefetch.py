@@ -0,0 +1,122 @@
+# Powered By Team DeadlineTech
+
+import asyncio
+from typing import Dict, List, Tuple
+
+import config
+from DeadlineTech import YouTube
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.misc import db
+from DeadlineTech.utils.download_scheduler import NEXT_UP, PLAYLIST
+from DeadlineTech.utils.media_cache import media_cache
+
+WATCH_INTERVAL = 5
+
+
+class Prefetcher:
+    """Downloads the next queued `vid_` tracks of every chat in the background.
+
+    Queues are re-checked every few seconds and whenever they change, so
+    prefetches for tracks that were skipped, shuffled away or cleared are
+    cancelled.
+    """
+
+    def __init__(self, depth: int, concurrency: int):
+        self.depth = depth
+        self.slots = asyncio.Semaphore(max(1, concurrency))
+        self.tasks: Dict[int, Dict[Tuple[str, str], asyncio.Task]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self._watcher = None
+
+    def _wanted(self, chat_id: int) -> List[Tuple[str, str]]:
+        wanted = []
+        for item in list(db.get(chat_id) or [])[1 : self.depth + 1]:
+            if not str(item.get("file", "")).startswith("vid_"):
+                continue
+            kind = "video" if str(item.get("streamtype")) == "video" else "audio"
+            wanted.append((item["vidid"], kind))
+        return wanted
+
+    def _ensure_watcher(self):
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL)
+            for chat_id in set(db.keys()) | set(self.tasks.keys()):
+                try:
+                    self.refresh(chat_id)
+                except Exception as e:
+                    LOGGER(__name__).warning(f"Prefetch refresh failed for {chat_id}: {e}")
+
+    def refresh(self, chat_id: int):
+        if self.depth <= 0:
+            return
+        self._ensure_watcher()
+        wanted = self._wanted(chat_id)
+        running = self.tasks.setdefault(chat_id, {})
+        for key, task in list(running.items()):
+            if key not in wanted:
+                if not task.done():
+                    task.cancel()
+                    self.cancelled += 1
+                running.pop(key, None)
+        for position, (vid, kind) in enumerate(wanted):
+            if (vid, kind) in running or media_cache.peek(vid, kind):
+                continue
+            self.started += 1
+            priority = NEXT_UP if position == 0 else PLAYLIST
+            running[(vid, kind)] = asyncio.create_task(self._fetch(vid, kind, chat_id, priority))
+        if not running:
+            self.tasks.pop(chat_id, None)
+
+    def cancel(self, chat_id: int):
+        for task in self.tasks.pop(chat_id, {}).values():
+            if not task.done():
+                task.cancel()
+                self.cancelled += 1
+
+    async def _fetch(self, vid: str, kind: str, chat_id: int, priority: int):
+        async with self.slots:
+            try:
+                path, _ = await YouTube.download(
+                    vid,
+                    None,
+                    videoid=True,
+                    video=True if kind == "video" else None,
+                    priority=priority,
+                    chat_id=chat_id,
+                )
+                if path:
+                    self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER(__name__).warning(f"Prefetch of {kind}:{vid} failed: {e}")
+
+    def record(self, vid: str, kind: str):
+        """Counts whether a track was already local when it came up to play."""
+        if media_cache.peek(vid, kind):
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "running": sum(
+                1 for tasks in self.tasks.values() for t in tasks.values() if not t.done()
+            ),
+        }
+
+
+prefetcher = Prefetcher(config.PREFETCH_DEPTH, config.PREFETCH_CONCURRENCY)
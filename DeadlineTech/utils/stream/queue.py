@@ -3,6 +3,7 @@ from typing import Union
 
 from DeadlineTech.misc import db
 from DeadlineTech.utils.formatters import check_duration, seconds_to_min
+from DeadlineTech.utils.stream.prefetch import prefetcher
 from config import autoclean, time_to_seconds
 
 
@@ -45,6 +46,7 @@ async def put_queue(
     else:
         db[chat_id].append(put)
     autoclean.append(file)
+    prefetcher.refresh(chat_id)
 
 
 async def put_queue_index(
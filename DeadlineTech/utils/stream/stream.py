@@ -1,3 +1,4 @@
+import asyncio
 import os
 from random import randint
 from typing import Union
@@ -7,15 +8,37 @@ from pyrogram.types import InlineKeyboardMarkup
 import config
 from DeadlineTech import Carbon, YouTube, app
 from DeadlineTech.core.call import Anony
+from DeadlineTech.platforms.Youtube import UnplayableError
 from DeadlineTech.misc import db
-from DeadlineTech.utils.database import add_active_video_chat, is_active_chat
+from DeadlineTech.utils.database import (
+    add_active_video_chat,
+    get_catalog_match,
+    is_active_chat,
+    save_catalog_match,
+)
+from DeadlineTech.utils.download_scheduler import NEXT_UP, NOW_PLAYING
 from DeadlineTech.utils.exceptions import AssistantErr
+from DeadlineTech.utils.formatters import time_to_seconds
 from DeadlineTech.utils.inline import aq_markup, close_markup, stream_markup
+from DeadlineTech.utils.latency import mark, set_source
 from DeadlineTech.utils.pastebin import AnonyBin
 from DeadlineTech.utils.stream.queue import put_queue, put_queue_index
 from DeadlineTech.utils.thumbnails import get_thumb
 
 
+async def _catalog_details(query: str, platform: str, track_id: str):
+    """YouTube.details() for a catalog playlist item, through its stored match when there is one."""
+    match = await get_catalog_match(platform, track_id)
+    if not match:
+        match = (await YouTube.track(query))[0]
+        if not match:
+            return None
+        await save_catalog_match(platform, track_id, match)
+    duration_min = match["duration_min"]
+    duration_sec = int(time_to_seconds(duration_min)) if duration_min else 0
+    return match["title"], duration_min, duration_sec, match["thumb"], match["vidid"]
+
+
 async def stream(
     _,
     mystic,
@@ -33,86 +56,107 @@ async def stream(
         return
     if forceplay:
         await Anony.force_stop_stream(chat_id)
+    if streamtype in ("telegram", "live", "index", "soundcloud"):
+        set_source(streamtype)
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
+        slots = asyncio.Semaphore(max(1, config.PLAYLIST_RESOLVE_CONCURRENCY))
+
+        async def resolve(search):
+            async with slots:
                 try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
-                    )
+                    # Spotify and Apple items carry their track id: (query, platform, id).
+                    if isinstance(search, tuple):
+                        return await _catalog_details(*search)
+                    return await YouTube.details(search, False if spotify else True)
                 except:
-                    raise AssistantErr(_["play_14"])
-                await Anony.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    return None
+
+        # Resolve concurrently but consume in playlist order, so the first
+        # playable item starts as soon as its own lookup is done.
+        lookups = [asyncio.create_task(resolve(search)) for search in result]
+        try:
+            for lookup in lookups:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                details = await lookup
+                if not details:
+                    continue
+                title, duration_min, duration_sec, thumbnail, vidid = details
+                if str(duration_min) == "None":
+                    continue
+                if duration_sec > config.DURATION_LIMIT:
+                    continue
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                    )
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        db[chat_id] = []
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True, progressive=True, chat_id=chat_id
+                        )
+                    except UnplayableError as e:
+                        raise AssistantErr(_["play_23"].format(e.message))
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    mark("download")
+                    await Anony.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
+                    )
+                    mark("join_call")
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid)
+                    mark("thumbnail")
+                    button = stream_markup(_, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    mark("card")
+                    db[chat_id][0]["mystic"] = run
+                    db[chat_id][0]["markup"] = "stream"
+        finally:
+            for lookup in lookups:
+                lookup.cancel()
         if count == 0:
             return
         else:
@@ -124,6 +168,7 @@ async def stream(
                 car = msg
             carbon = await Carbon.generate(car, randint(100, 10000000))
             upl = close_markup(_)
+            mark("playlist_fill")
             return await app.send_photo(
                 original_chat_id,
                 photo=carbon,
@@ -137,13 +182,24 @@ async def stream(
         duration_min = result["duration_min"]
         thumbnail = result["thumb"]
         status = True if video else None
+        # Into an active chat it only joins the queue, so it need not jump ahead of tracks about to play.
+        priority = NEXT_UP if await is_active_chat(chat_id) else NOW_PLAYING
         try:
             file_path, direct = await YouTube.download(
-                vidid, mystic, videoid=True, video=status
+                vidid,
+                mystic,
+                videoid=True,
+                video=status,
+                progressive=True,
+                priority=priority,
+                chat_id=chat_id,
             )
+        except UnplayableError as e:
+            raise AssistantErr(_["play_23"].format(e.message))
         except Exception as ex:
             print(ex)
             raise AssistantErr(_["play_14"])
+        mark("download")
         if await is_active_chat(chat_id):
             await put_queue(
                 chat_id,
@@ -163,6 +219,7 @@ async def stream(
                 text=_["queue_4"].format(position, title[:27], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
         else:
             if not forceplay:
                 db[chat_id] = []
@@ -173,6 +230,7 @@ async def stream(
                 video=status,
                 image=thumbnail,
             )
+            mark("join_call")
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -186,6 +244,7 @@ async def stream(
                 forceplay=forceplay,
             )
             img = await get_thumb(vidid)
+            mark("thumbnail")
             button = stream_markup(_, chat_id)
             run = await app.send_photo(
                 original_chat_id,
@@ -198,6 +257,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
             db[chat_id][0]["mystic"] = run
             db[chat_id][0]["markup"] = "stream"
     elif streamtype == "soundcloud":
@@ -223,10 +283,12 @@ async def stream(
                 text=_["queue_4"].format(position, title[:27], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
         else:
             if not forceplay:
                 db[chat_id] = []
             await Anony.join_call(chat_id, original_chat_id, file_path, video=None)
+            mark("join_call")
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -248,6 +310,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
             db[chat_id][0]["mystic"] = run
             db[chat_id][0]["markup"] = "tg"
     elif streamtype == "telegram":
@@ -275,10 +338,12 @@ async def stream(
                 text=_["queue_4"].format(position, title[:27], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
         else:
             if not forceplay:
                 db[chat_id] = []
             await Anony.join_call(chat_id, original_chat_id, file_path, video=status)
+            mark("join_call")
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -300,6 +365,7 @@ async def stream(
                 caption=_["stream_1"].format(link, title[:23], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
             db[chat_id][0]["mystic"] = run
             db[chat_id][0]["markup"] = "tg"
     elif streamtype == "live":
@@ -328,12 +394,14 @@ async def stream(
                 text=_["queue_4"].format(position, title[:27], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
         else:
             if not forceplay:
                 db[chat_id] = []
-            n, file_path = await YouTube.video(link)
+            n, file_path = await YouTube.video(link, chat_id=chat_id)
             if n == 0:
                 raise AssistantErr(_["str_3"])
+            mark("download")
             await Anony.join_call(
                 chat_id,
                 original_chat_id,
@@ -341,6 +409,7 @@ async def stream(
                 video=status,
                 image=thumbnail if thumbnail else None,
             )
+            mark("join_call")
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -354,6 +423,7 @@ async def stream(
                 forceplay=forceplay,
             )
             img = await get_thumb(vidid)
+            mark("thumbnail")
             button = stream_markup(_, chat_id)
             run = await app.send_photo(
                 original_chat_id,
@@ -366,6 +436,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
+            mark("card")
             db[chat_id][0]["mystic"] = run
             db[chat_id][0]["markup"] = "tg"
     elif streamtype == "index":
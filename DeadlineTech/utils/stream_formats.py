@@ -0,0 +1,63 @@
+# Powered By Team DeadlineTech
+
+from pytgcalls.types.input_stream import AudioParameters, VideoParameters
+from pytgcalls.types.input_stream.quality import (
+    HighQualityAudio,
+    HighQualityVideo,
+    LowQualityAudio,
+    LowQualityVideo,
+    MediumQualityAudio,
+    MediumQualityVideo,
+)
+
+import config
+
+AUDIO_QUALITIES = {"high": HighQualityAudio, "medium": MediumQualityAudio, "low": LowQualityAudio}
+VIDEO_QUALITIES = {"high": HighQualityVideo, "medium": MediumQualityVideo, "low": LowQualityVideo}
+
+# What downloads asked for before following the call quality; yt-dlp reports sizes against these.
+BASELINE_AUDIO = "bestaudio/best"
+BASELINE_VIDEO = "(bestvideo+bestaudio)"
+BASELINE_STREAM = "best[height<=?720]"
+
+# A ready-muxed format this close to the call height beats merging separate streams.
+PROGRESSIVE_MIN_SHARE = 0.75
+# Bitrate cap (kbps) for audio when the call itself is mono.
+MONO_AUDIO_KBPS = 96
+
+
+def audio_quality() -> AudioParameters:
+    return AUDIO_QUALITIES.get(config.STREAM_AUDIO_QUALITY, HighQualityAudio)()
+
+
+def video_quality() -> VideoParameters:
+    return VIDEO_QUALITIES.get(config.STREAM_VIDEO_QUALITY, MediumQualityVideo)()
+
+
+def audio_format() -> str:
+    """yt-dlp selector for audio downloads: Opus first, it is what the call is encoded to."""
+    if audio_quality().channels >= 2:
+        return "bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best"
+    cap = MONO_AUDIO_KBPS
+    return f"bestaudio[acodec=opus][abr<={cap}]/bestaudio[abr<={cap}]/bestaudio[acodec=opus]/bestaudio/best"
+
+
+def video_format() -> str:
+    """yt-dlp selector for video downloads no larger than the call resolution.
+
+    Progressive formats close to the target come first since they need no
+    merge; otherwise the best video stream within the target plus Opus audio.
+    """
+    height = video_quality().height
+    low = int(height * PROGRESSIVE_MIN_SHARE)
+    return (
+        f"best[height>={low}][height<={height}]"
+        f"/bestvideo[height<={height}]+bestaudio[acodec=opus]"
+        f"/bestvideo[height<={height}]+bestaudio"
+        f"/best[height<={height}]/best"
+    )
+
+
+def stream_format() -> str:
+    """yt-dlp selector for a single URL ffmpeg plays directly (live streams, seeks)."""
+    return f"best[height<=?{video_quality().height}]/best"
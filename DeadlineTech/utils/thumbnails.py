@@ -7,7 +7,8 @@ import traceback
 import config
 
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont, ImageOps
-from py_yt import VideosSearch
+
+from DeadlineTech import YouTube
 
 
 def changeImageSize(maxWidth, maxHeight, image):
@@ -52,16 +53,14 @@ def fit_text(draw, text, max_width, font_path, start_size, min_size):
 
 
 async def get_thumb(videoid: str):
-    url = f"https://www.youtube.com/watch?v={videoid}"
     try:
-        # Changed to py_yt VideosSearch
-        results = VideosSearch(url, limit=1)
-        for result in (await results.next())["result"]:
-            title = re.sub(r"\W+", " ", result.get("title", "Unsupported Title")).title()
-            duration = result.get("duration", "Unknown Mins")
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            views = result.get("viewCount", {}).get("short", "Unknown Views")
-            channel = result.get("channel", {}).get("name", "Unknown Channel")
+        # Shares the metadata already resolved for /play instead of searching again
+        meta = await YouTube.metadata(videoid, True)
+        title = re.sub(r"\W+", " ", meta.get("title") or "Unsupported Title").title()
+        duration = meta.get("duration_min") or "Unknown Mins"
+        thumbnail = meta["thumb"]
+        views = meta.get("views") or "Unknown Views"
+        channel = meta.get("channel") or "Unknown Channel"
 
         async with aiohttp.ClientSession() as session:
             async with session.get(thumbnail) as resp:
@@ -0,0 +1,217 @@
+# Powered By Team DeadlineTech
+
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Optional
+
+import config
+from DeadlineTech.logging import LOGGER
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ytdlp_worker.py")
+# Extracted info for long playlists/livestreams can be several MB on one line.
+STREAM_LIMIT = 32 * 1024 * 1024
+START_TIMEOUT = 30
+
+
+class YtdlpError(Exception):
+    """yt-dlp raised inside a worker; the message is yt-dlp's own."""
+
+
+class YtdlpPoolBusy(Exception):
+    """The pool queue is full."""
+
+
+class _Worker:
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self.calls = 0
+        self.dead = False
+
+    @classmethod
+    async def start(cls) -> "_Worker":
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, WORKER_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=STREAM_LIMIT,
+        )
+        worker = cls(proc)
+        try:
+            # The worker reports ready once yt_dlp and its extractors are imported.
+            await asyncio.wait_for(worker._read(), START_TIMEOUT)
+        except BaseException:
+            worker.kill()
+            raise
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return not self.dead and self.proc.returncode is None
+
+    async def _read(self) -> dict:
+        line = await self.proc.stdout.readline()
+        if not line:
+            self.dead = True
+            raise YtdlpError("yt-dlp worker exited")
+        return json.loads(line)
+
+    async def request(self, op: str, url: str, opts: dict, baseline: Optional[str] = None) -> dict:
+        self.calls += 1
+        req = {"op": op, "url": url, "opts": opts, "baseline": baseline}
+        self.proc.stdin.write((json.dumps(req) + "\n").encode())
+        await self.proc.stdin.drain()
+        resp = await self._read()
+        if not resp.get("ok"):
+            raise YtdlpError(resp.get("error") or "unknown yt-dlp error")
+        return resp
+
+    def kill(self):
+        self.dead = True
+        if self.proc.returncode is None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+
+
+class YtdlpPool:
+    """A fixed set of warm yt-dlp worker processes.
+
+    Each worker keeps its YoutubeDL instances between calls, so extractor setup
+    and interpreter start-up are paid once. Calls wait in a bounded queue; a
+    call that times out or is cancelled kills its worker, which is replaced on
+    the next call.
+    """
+
+    def __init__(self, size: int, queue_size: int, timeout: float):
+        self.size = max(1, size)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self._idle: Optional[asyncio.Queue] = None
+        self._spawned = 0
+        self._pending = 0
+        self._wakeups = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.restarts = 0
+        # Bytes of the formats fetched vs. what the baseline selectors would have fetched.
+        self.bytes_selected = 0
+        self.bytes_baseline = 0
+
+    async def _acquire(self) -> _Worker:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        while True:
+            if self._idle.empty() and self._spawned < self.size:
+                self._spawned += 1
+                try:
+                    return await _Worker.start()
+                except BaseException:
+                    self._spawned -= 1
+                    raise
+            worker = await self._idle.get()
+            if worker is None:
+                # A worker died and freed its place: loop round and spawn a replacement.
+                self._wakeups -= 1
+                continue
+            if worker.alive:
+                return worker
+            self._spawned -= 1
+
+    def _release(self, worker: _Worker):
+        if worker.alive:
+            self._idle.put_nowait(worker)
+        else:
+            self._spawned -= 1
+            self.restarts += 1
+            # Wake one caller waiting for an idle worker so it spawns the replacement.
+            self._wakeups += 1
+            self._idle.put_nowait(None)
+            LOGGER(__name__).warning("yt-dlp worker stopped; a new one starts on the next call")
+
+    def _account(self, sizes: Optional[dict]):
+        if not sizes or not sizes.get("selected") or not sizes.get("baseline"):
+            return
+        self.bytes_selected += sizes["selected"]
+        self.bytes_baseline += sizes["baseline"]
+
+    async def call(
+        self, op: str, url: str, opts: dict, timeout: Optional[float] = None, baseline: Optional[str] = None
+    ) -> Any:
+        if self._pending >= self.size + self.queue_size:
+            self.rejected += 1
+            raise YtdlpPoolBusy(f"{self._pending} yt-dlp calls already pending")
+        self._pending += 1
+        limit = timeout or self.timeout
+        try:
+            try:
+                worker = await asyncio.wait_for(self._acquire(), limit)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise
+            try:
+                resp = await asyncio.wait_for(worker.request(op, url, opts, baseline), limit)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                worker.kill()
+                raise
+            except asyncio.CancelledError:
+                # The worker is mid-request; its next answer would be stale.
+                worker.kill()
+                raise
+            except YtdlpError:
+                self.failed += 1
+                raise
+            except Exception:
+                self.failed += 1
+                worker.kill()
+                raise
+            finally:
+                self._release(worker)
+            self.completed += 1
+            self._account(resp.get("sizes"))
+            return resp.get("result")
+        finally:
+            self._pending -= 1
+
+    async def extract(self, url: str, opts: dict, timeout: Optional[float] = None) -> dict:
+        """extract_info(download=False) with formats trimmed to the commonly used fields."""
+        return await self.call("extract", url, opts, timeout)
+
+    async def resolve(
+        self, url: str, opts: dict, timeout: Optional[float] = None, baseline: Optional[str] = None
+    ) -> Optional[str]:
+        """Direct media URL for the selected format (like `yt-dlp -g`).
+
+        With `baseline`, the size of the selected format is compared against the
+        format that selector would have picked (see `stats()["bytes_saved"]`).
+        """
+        return await self.call("resolve", url, opts, timeout, baseline)
+
+    async def download(
+        self, url: str, opts: dict, timeout: Optional[float] = None, baseline: Optional[str] = None
+    ) -> Optional[str]:
+        """Downloads with `opts` and returns the written file path; `baseline` as in `resolve`."""
+        return await self.call("download", url, opts, timeout, baseline)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self._spawned,
+            "idle": self._idle.qsize() - self._wakeups if self._idle else 0,
+            "pending": self._pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "bytes_selected": self.bytes_selected,
+            "bytes_saved": self.bytes_baseline - self.bytes_selected,
+        }
+
+
+ytdlp_pool = YtdlpPool(config.YTDLP_WORKERS, config.YTDLP_QUEUE_SIZE, config.YTDLP_TIMEOUT)
@@ -0,0 +1,119 @@
+# Powered By Team DeadlineTech
+#
+# Long-lived yt-dlp worker driven by DeadlineTech.utils.ytdlp_pool.
+# Run as a plain script (not as part of the package) so spawning it never
+# imports the bot. Reads one JSON request per line on stdin and answers with
+# one JSON line on stdout.
+
+import json
+import os
+import sys
+
+import yt_dlp
+
+MAX_INSTANCES = 8
+
+FORMAT_FIELDS = (
+    "format", "format_id", "format_note", "ext", "filesize", "filesize_approx",
+    "url", "protocol", "vcodec", "acodec", "height", "width", "fps", "abr", "tbr", "asr",
+)
+INFO_FIELDS = ("id", "title", "duration", "ext", "url", "format_id", "is_live")
+
+_instances = {}
+
+
+def _ydl(opts: dict) -> yt_dlp.YoutubeDL:
+    # A cookie file that changed on disk must be reloaded, so its mtime is part of the key.
+    cookie = opts.get("cookiefile")
+    try:
+        cookie_mtime = os.path.getmtime(cookie) if cookie else None
+    except OSError:
+        cookie_mtime = None
+    key = (json.dumps(opts, sort_keys=True), cookie_mtime)
+    ydl = _instances.pop(key, None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(dict(opts, quiet=True, no_warnings=True, noprogress=True))
+        while len(_instances) >= MAX_INSTANCES:
+            _instances.pop(next(iter(_instances))).close()
+    _instances[key] = ydl
+    return ydl
+
+
+def _trim(info: dict) -> dict:
+    out = {k: info.get(k) for k in INFO_FIELDS}
+    out["formats"] = [{k: f.get(k) for k in FORMAT_FIELDS} for f in info.get("formats") or []]
+    out["requested_formats"] = [
+        {k: f.get(k) for k in FORMAT_FIELDS} for f in info.get("requested_formats") or []
+    ]
+    return out
+
+
+def _size(fmt: dict, duration) -> int:
+    size = fmt.get("filesize") or fmt.get("filesize_approx")
+    if not size and fmt.get("tbr") and duration:
+        size = fmt["tbr"] * 1000 / 8 * duration
+    return int(size or 0)
+
+
+def _sizes(ydl: yt_dlp.YoutubeDL, info: dict, baseline: str) -> dict:
+    """Bytes of the selected format(s) and of what the `baseline` selector would have picked."""
+    duration = info.get("duration")
+    selected = sum(_size(f, duration) for f in info.get("requested_formats") or [info])
+    formats = info.get("formats") or []
+    try:
+        ctx = {
+            "formats": formats,
+            "has_merged_format": any("none" not in (f.get("acodec"), f.get("vcodec")) for f in formats),
+            "incomplete_formats": all(f.get("vcodec") == "none" for f in formats)
+            or all(f.get("acodec") == "none" for f in formats),
+        }
+        chosen = next(iter(ydl.build_format_selector(baseline)(ctx)), None)
+    except Exception:
+        chosen = None
+    if not chosen:
+        return {"selected": selected, "baseline": 0}
+    base = sum(_size(f, duration) for f in chosen.get("requested_formats") or [chosen])
+    return {"selected": selected, "baseline": base}
+
+
+def _handle(op: str, url: str, opts: dict, baseline=None):
+    """Returns (result, sizes); sizes is only filled for resolve/download with a baseline."""
+    ydl = _ydl(opts)
+    if op == "extract":
+        return _trim(ydl.extract_info(url, download=False)), None
+    if op == "resolve":
+        info = ydl.extract_info(url, download=False)
+        sizes = _sizes(ydl, info, baseline) if baseline else None
+        if info.get("url"):
+            return info["url"], sizes
+        requested = info.get("requested_formats") or []
+        return (requested[0].get("url") if requested else None), sizes
+    if op == "download":
+        info = ydl.extract_info(url, download=True)
+        sizes = _sizes(ydl, info, baseline) if baseline else None
+        for item in info.get("requested_downloads") or []:
+            if item.get("filepath"):
+                return item["filepath"], sizes
+        return ydl.prepare_filename(info), sizes
+    raise ValueError(f"unknown op {op}")
+
+
+def main():
+    proto = sys.stdout
+    # yt-dlp and extractors may print; keep stdout for the protocol only.
+    sys.stdout = sys.stderr
+    proto.write(json.dumps({"ready": True}) + "\n")
+    proto.flush()
+    for line in sys.stdin:
+        try:
+            req = json.loads(line)
+            result, sizes = _handle(req["op"], req["url"], req.get("opts") or {}, req.get("baseline"))
+            resp = {"ok": True, "result": result, "sizes": sizes}
+        except Exception as e:
+            resp = {"ok": False, "error": str(e)}
+        proto.write(json.dumps(resp) + "\n")
+        proto.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,8 @@ SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", "c9c63c6fbf2f467c8bc6862
 
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
+# How many playlist tracks are looked up on YouTube at the same time.
+PLAYLIST_RESOLVE_CONCURRENCY = int(getenv("PLAYLIST_RESOLVE_CONCURRENCY", 5))
 
 
 # Telegram audio and video file size limit (in bytes)
@@ -68,6 +70,56 @@ TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 1073741824))
 # Checkout https://www.gbmb.org/mb-to-bytes for converting mb to bytes
 
 
+# Disk budget (in MB) for downloaded tracks kept in the downloads folder for replays.
+MEDIA_CACHE_SIZE_MB = int(getenv("MEDIA_CACHE_SIZE_MB", 2048))
+# Which cached tracks get removed first when the budget is exceeded: "lru" or "lfu".
+MEDIA_CACHE_POLICY = getenv("MEDIA_CACHE_POLICY", "lru").lower()
+
+# How long (in seconds) YouTube search metadata is reused, and whether it is also kept in MongoDB.
+YT_META_CACHE_TTL = int(getenv("YT_META_CACHE_TTL", 21600))
+YT_META_MONGO_CACHE = getenv("YT_META_MONGO_CACHE", "True").lower() == "true"
+
+# Whether CDN links handed out by the download API are also kept in MongoDB, so other nodes can reuse them.
+V2_URL_MONGO_CACHE = getenv("V2_URL_MONGO_CACHE", "True").lower() == "true"
+
+# How many upcoming queued tracks are downloaded in the background, and how many at once.
+PREFETCH_DEPTH = int(getenv("PREFETCH_DEPTH", 2))
+PREFETCH_CONCURRENCY = int(getenv("PREFETCH_CONCURRENCY", 1))
+
+# Start playing API downloads once this many KB have arrived instead of after the whole file.
+PROGRESSIVE_PLAYBACK = getenv("PROGRESSIVE_PLAYBACK", "False").lower() == "true"
+PROGRESSIVE_PREFIX_KB = int(getenv("PROGRESSIVE_PREFIX_KB", 768))
+
+# Load every track id of the media database at boot so unknown tracks skip the MongoDB lookup.
+MEDIA_DB_PRELOAD = getenv("MEDIA_DB_PRELOAD", "False").lower() == "true"
+
+# Days a Spotify/Apple/Resso track keeps its matched YouTube video before it is searched again.
+CATALOG_MATCH_TTL_DAYS = int(getenv("CATALOG_MATCH_TTL_DAYS", 30))
+
+# Upload tracks fetched from the API or cookies to MEDIA_CHANNEL_ID so later requests hit the media database,
+# and how many uploads may wait in the backlog.
+MEDIA_UPLOAD = getenv("MEDIA_UPLOAD", "True").lower() == "true"
+MEDIA_UPLOAD_BACKLOG = int(getenv("MEDIA_UPLOAD_BACKLOG", 200))
+
+# Start the next download tier in parallel once the current one is slower than this percentile of its usual latency.
+TIER_HEDGE_PERCENTILE = float(getenv("TIER_HEDGE_PERCENTILE", 0.95))
+
+# How many track downloads run at once, connections allowed per CDN host, and an optional
+# total download bandwidth cap in KB/s (0 = unlimited).
+DOWNLOAD_CONCURRENCY = int(getenv("DOWNLOAD_CONCURRENCY", 6))
+DOWNLOAD_PER_HOST = int(getenv("DOWNLOAD_PER_HOST", 8))
+DOWNLOAD_BANDWIDTH_KBPS = int(getenv("DOWNLOAD_BANDWIDTH_KBPS", 0))
+
+# Warm yt-dlp worker processes, how many calls may wait for one, and the per-call timeout (seconds).
+YTDLP_WORKERS = int(getenv("YTDLP_WORKERS", 2))
+YTDLP_QUEUE_SIZE = int(getenv("YTDLP_QUEUE_SIZE", 32))
+YTDLP_TIMEOUT = int(getenv("YTDLP_TIMEOUT", 60))
+
+# Quality of voice/video chat streams ("high", "medium" or "low"); downloads fetch the smallest format that fits it.
+STREAM_AUDIO_QUALITY = getenv("STREAM_AUDIO_QUALITY", "high").lower()
+STREAM_VIDEO_QUALITY = getenv("STREAM_VIDEO_QUALITY", "medium").lower()
+
+
 # Get your pyrogram v2 session from @StringFatherBot on Telegram
 STRING1 = getenv("STRING_SESSION", None)
 STRING2 = getenv("STRING_SESSION2", None)